@@ -110,14 +110,22 @@ def search_universal_patterns(by_type):
     print("\nTesting basic rate patterns:")
     
     # Pattern 1: Base daily rate + mileage rate + receipt percentage
-    for daily_rate in [80, 90, 100, 110, 120]:
-        for mileage_rate in [0.3, 0.4, 0.5, 0.6, 0.7]:
-            for receipt_rate in [0.1, 0.2, 0.3, 0.4, 0.5]:
-                df['predicted'] = daily_rate * df['days'] + mileage_rate * df['miles'] + receipt_rate * df['receipts']
-                exact_matches = (abs(df['predicted'] - df['expected']) < 0.01).sum()
-                if exact_matches > 50:  # If we get many matches
-                    print(f"Pattern: {daily_rate}*days + {mileage_rate}*miles + {receipt_rate}*receipts")
-                    print(f"Exact matches: {exact_matches}/1000")
+    daily_rates = [80, 90, 100, 110, 120]
+    mileage_rates = [0.3, 0.4, 0.5, 0.6, 0.7]
+    receipt_rates = [0.1, 0.2, 0.3, 0.4, 0.5]
+    
+    # Every (daily, mileage, receipt) rate triple is predicted for every case
+    # in one broadcast; the absolute errors are materialized once and the
+    # match counts come from a single reduction over the case axis
+    predicted = (np.array(daily_rates)[:, None, None, None] * df['days'].to_numpy()
+                 + np.array(mileage_rates)[None, :, None, None] * df['miles'].to_numpy()
+                 + np.array(receipt_rates)[None, None, :, None] * df['receipts'].to_numpy())
+    errors = np.abs(predicted - df['expected'].to_numpy())
+    exact_counts = np.count_nonzero(errors < 0.01, axis=-1)
+    
+    for i, j, k in np.argwhere(exact_counts > 50):  # If we get many matches
+        print(f"Pattern: {daily_rates[i]}*days + {mileage_rates[j]}*miles + {receipt_rates[k]}*receipts")
+        print(f"Exact matches: {exact_counts[i, j, k]}/1000")
     
     return df
 
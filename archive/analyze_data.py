@@ -89,12 +89,17 @@ print(f"High mileage (>100): {len(high_miles)} cases, avg per mile: ${high_miles
 
 # Look for receipt amount thresholds
 print("\n=== RECEIPT THRESHOLD ANALYSIS ===")
+# Sort by receipts once; a threshold then splits the sorted outputs at one
+# index, and both side averages come from the running sum of outputs
+receipt_order = np.argsort(df['receipts'].to_numpy(), kind='stable')
+sorted_receipts = df['receipts'].to_numpy()[receipt_order]
+output_cumsum = np.cumsum(df['output'].to_numpy()[receipt_order])
 for threshold in [50, 100, 200, 500, 800, 1000]:
-    low_receipts = df[df['receipts'] <= threshold]
-    high_receipts = df[df['receipts'] > threshold]
-    if len(low_receipts) > 0 and len(high_receipts) > 0:
-        print(f"Receipts ≤${threshold}: avg output ${low_receipts['output'].mean():.2f}")
-        print(f"Receipts >${threshold}: avg output ${high_receipts['output'].mean():.2f}")
+    n_low = np.searchsorted(sorted_receipts, threshold, side='right')
+    n_high = len(sorted_receipts) - n_low
+    if n_low > 0 and n_high > 0:
+        print(f"Receipts ≤${threshold}: avg output ${output_cumsum[n_low - 1] / n_low:.2f}")
+        print(f"Receipts >${threshold}: avg output ${(output_cumsum[-1] - output_cumsum[n_low - 1]) / n_high:.2f}")
 
 # Let's look for exact patterns by examining specific cases
 print("\n=== EXACT PATTERN SEARCH ===")
@@ -122,9 +127,11 @@ def find_similar_cases(df, tolerance=0.01):
 # Look for the exact mathematical function
 print("\n=== SEARCHING FOR EXACT FUNCTION ===")
 
-# Test various hypotheses from the interviews
+# Test various hypotheses from the interviews. Each formula takes the whole
+# DataFrame and works on columns, with np.where for the tiered branches,
+# rather than being applied one row at a time
 def test_formula(df, formula_func, name):
-    df['predicted'] = df.apply(formula_func, axis=1)
+    df['predicted'] = formula_func(df)
     df['error'] = abs(df['predicted'] - df['output'])
     max_error = df['error'].max()
     mean_error = df['error'].mean()
@@ -132,37 +139,32 @@ def test_formula(df, formula_func, name):
     return max_error < 0.01  # Perfect match threshold
 
 # Hypothesis 1: Base rate + mileage + receipt adjustments
-def formula1(row):
-    base = row['days'] * 100  # $100/day base
-    mileage = row['miles'] * 0.58  # Standard mileage rate
-    receipts = row['receipts'] * 0.8  # 80% reimbursement
+def formula1(df):
+    base = df['days'] * 100  # $100/day base
+    mileage = df['miles'] * 0.58  # Standard mileage rate
+    receipts = df['receipts'] * 0.8  # 80% reimbursement
     return base + mileage + receipts
 
 test_formula(df, formula1, "Base + Linear mileage + Linear receipts")
 
 # Hypothesis 2: Include efficiency bonus
-def formula2(row):
-    base = row['days'] * 100
+def formula2(df):
+    days = df['days'].to_numpy(dtype=np.float64)
+    miles = df['miles'].to_numpy(dtype=np.float64)
+    receipts = df['receipts'].to_numpy(dtype=np.float64)
+    
+    base = days * 100
     # Tiered mileage
-    if row['miles'] <= 100:
-        mileage = row['miles'] * 0.58
-    else:
-        mileage = 100 * 0.58 + (row['miles'] - 100) * 0.45
+    mileage = np.where(miles <= 100, miles * 0.58, 100 * 0.58 + (miles - 100) * 0.45)
     
     # Receipt processing with diminishing returns
-    if row['receipts'] <= 100:
-        receipts = row['receipts'] * 0.9
-    else:
-        receipts = 100 * 0.9 + (row['receipts'] - 100) * 0.6
+    receipt_amount = np.where(receipts <= 100, receipts * 0.9, 100 * 0.9 + (receipts - 100) * 0.6)
     
     # Efficiency bonus
-    efficiency = row['miles'] / row['days']
-    if 180 <= efficiency <= 220:
-        bonus = 50
-    else:
-        bonus = 0
-        
-    return base + mileage + receipts + bonus
+    efficiency = miles / days
+    bonus = np.where((efficiency >= 180) & (efficiency <= 220), 50, 0)
+    
+    return base + mileage + receipt_amount + bonus
 
 test_formula(df, formula2, "Tiered rates + Efficiency bonus")
 
@@ -55,25 +55,37 @@ print(f"  Miles: {df['error'].corr(df['miles']):.3f}")
 print(f"  Receipts: {df['error'].corr(df['receipts']):.3f}")
 
 # Check if there are threshold effects causing large errors
+# Each breakdown assigns every case a group code in one pass and summarizes
+# the errors with a single groupby, instead of one boolean filter per group
+def error_summary(codes):
+    """Case count, mean error and max error for each group code"""
+    return df['error'].groupby(codes).agg(['size', 'mean', 'max'])
+
+def range_codes(values, ranges):
+    """Index of the [low, high) range each value falls in (-1 or len(ranges) if none)"""
+    edges = [low for low, _ in ranges] + [ranges[-1][1]]
+    return np.searchsorted(edges, values, side='right') - 1
+
 print(f"\nError by trip length:")
-for days in sorted(df['days'].unique()):
-    day_data = df[df['days'] == days]
-    if len(day_data) >= 5:
-        print(f"  {days:2.0f} days: avg error {day_data['error'].mean():6.2f}, max error {day_data['error'].max():6.2f}")
+for days, (count, mean_error, max_error) in error_summary(df['days'].to_numpy()).iterrows():
+    if count >= 5:
+        print(f"  {days:2.0f} days: avg error {mean_error:6.2f}, max error {max_error:6.2f}")
 
 print(f"\nError by receipt amount ranges:")
 receipt_ranges = [(0, 100), (100, 500), (500, 1000), (1000, 2000), (2000, 3000)]
-for low, high in receipt_ranges:
-    range_data = df[(df['receipts'] >= low) & (df['receipts'] < high)]
-    if len(range_data) > 0:
-        print(f"  ${low}-${high}: {len(range_data):3d} cases, avg error {range_data['error'].mean():6.2f}, max error {range_data['error'].max():6.2f}")
+receipt_summary = error_summary(range_codes(df['receipts'].to_numpy(), receipt_ranges))
+for code, (low, high) in enumerate(receipt_ranges):
+    if code in receipt_summary.index:
+        count, mean_error, max_error = receipt_summary.loc[code]
+        print(f"  ${low}-${high}: {int(count):3d} cases, avg error {mean_error:6.2f}, max error {max_error:6.2f}")
 
 print(f"\nError by mileage ranges:")
 mile_ranges = [(0, 100), (100, 300), (300, 600), (600, 1000), (1000, 2000)]
-for low, high in mile_ranges:
-    range_data = df[(df['miles'] >= low) & (df['miles'] < high)]
-    if len(range_data) > 0:
-        print(f"  {low}-{high} miles: {len(range_data):3d} cases, avg error {range_data['error'].mean():6.2f}, max error {range_data['error'].max():6.2f}")
+mile_summary = error_summary(range_codes(df['miles'].to_numpy(), mile_ranges))
+for code, (low, high) in enumerate(mile_ranges):
+    if code in mile_summary.index:
+        count, mean_error, max_error = mile_summary.loc[code]
+        print(f"  {low}-{high} miles: {int(count):3d} cases, avg error {mean_error:6.2f}, max error {max_error:6.2f}")
 
 # Check for the interview insights - do high receipt cases get penalized?
 print(f"\n=== TESTING INTERVIEW INSIGHTS ===")
@@ -24,11 +24,20 @@ FEATURES:
 - Special adjustments for receipt patterns ending in 49/99
 - Five-day trip bonuses
 - Robust performance across all case types
+- calculate_reimbursement_batch() for scoring arrays of trips in one call
 """
 
 import sys
 import math
 
+# The tree splits on log1p(receipts); log1p is monotonic, so compare the raw
+# receipts against expm1 of those thresholds instead of taking a log per call
+LOG_RECEIPTS_SPLIT_LOW = math.expm1(6.720334)
+LOG_RECEIPTS_SPLIT_HIGH = math.expm1(7.739514)
+
+# Adjustment for each possible cents value: receipts ending in 49 or 99 get 3
+CENTS_ADJUSTMENT = tuple(3 if cents in (49, 99) else 0 for cents in range(100))
+
 def calculate_reimbursement(trip_duration_days, miles_traveled, total_receipts_amount):
     """Calculate reimbursement using decision tree approximation of gradient boosting model"""
     days = int(trip_duration_days)
@@ -38,17 +47,14 @@ def calculate_reimbursement(trip_duration_days, miles_traveled, total_receipts_a
     # Features
     inv_receipts = 1 / (1 + receipts)
     three_way = days * miles * receipts / 1000
-    log_receipts = math.log1p(receipts)
     days_miles = days * miles
     receipts_sq_scaled = receipts ** 2 / 1e6
     days_receipts = days * receipts
     miles_receipts_scaled = miles * receipts / 1000
-    five_day = 1 if days == 5 else 0
-    ends49 = 1 if int(receipts * 100) % 100 == 49 else 0
-    ends99 = 1 if int(receipts * 100) % 100 == 99 else 0
+    cents = int(receipts * 100) % 100
     
     # Decision tree (manually inlined for efficiency)
-    if log_receipts <= 6.720334:
+    if receipts <= LOG_RECEIPTS_SPLIT_LOW:
         if days_miles <= 2070.000000:
             if days_receipts <= 562.984985:
                 if days_miles <= 566.000000:
@@ -139,7 +145,7 @@ def calculate_reimbursement(trip_duration_days, miles_traveled, total_receipts_a
                     else:
                         result = 1693.27
                 else:
-                    if log_receipts <= 7.739514:
+                    if receipts <= LOG_RECEIPTS_SPLIT_HIGH:
                         result = 1642.03
                     else:
                         result = 1677.18
@@ -161,16 +167,149 @@ def calculate_reimbursement(trip_duration_days, miles_traveled, total_receipts_a
                     else:
                         result = 1882.41
     
-    # Apply special adjustments for exact features not captured by tree
-    if ends49:
-        result += 3
-    if ends99:
-        result += 3
-    if five_day:
-        result += 10
+    # Apply special adjustments for exact features not captured by tree;
+    # the cents one is a table lookup and the 5-day flag is added as 0/1
+    result += CENTS_ADJUSTMENT[cents] + 10 * (days == 5)
     
     return round(result, 2)
 
+# Same tree as the inlined version above, as (feature, threshold, left, right)
+# nodes with leaf values, so it can be evaluated over whole arrays at once.
+_TREE = (
+    ('log_receipts', 6.720334,
+        ('days_miles', 2070.000000,
+            ('days_receipts', 562.984985,
+                ('days_miles', 566.000000,
+                    287.10,
+                    581.58),
+                ('days_receipts', 3089.010010,
+                    ('days_miles', 1310.500000,
+                        ('receipts', 461.820007,
+                            557.93,
+                            643.31),
+                        750.45),
+                    876.59)),
+            ('three_way', 2172.216919,
+                ('days_miles', 4940.000000,
+                    ('three_way', 1258.291565,
+                        ('days', 5.500000,
+                            770.85,
+                            864.46),
+                        ('receipts', 506.684998,
+                            941.68,
+                            1012.53)),
+                    1145.20),
+                ('three_way', 3762.473267,
+                    ('miles', 771.000000,
+                        1163.81,
+                        1240.19),
+                    1442.54))),
+        ('three_way', 6405.638672,
+            ('three_way', 1253.387817,
+                ('days_receipts', 9442.660156,
+                    ('inv_receipts', 0.000923,
+                        ('days_miles', 449.000000,
+                            1196.52,
+                            1296.70),
+                        1067.12),
+                    1505.52),
+                ('days_receipts', 5494.430176,
+                    ('three_way', 2917.123047,
+                        ('miles_receipts_scaled', 834.080933,
+                            1297.57,
+                            1392.04),
+                        1488.02),
+                    ('days_receipts', 13199.189941,
+                        ('miles', 518.500000,
+                            ('days_miles', 2517.500000,
+                                ('three_way', 2272.934448,
+                                    1463.72,
+                                    1523.63),
+                                1410.89),
+                            ('three_way', 5415.271729,
+                                1571.23,
+                                1618.87)),
+                        ('days', 10.500000,
+                            1588.76,
+                            1671.65)))),
+            ('days_miles', 6483.000000,
+                ('receipts_sq_scaled', 4.168643,
+                    ('days', 7.500000,
+                        1765.20,
+                        1693.27),
+                    ('log_receipts', 7.739514,
+                        1642.03,
+                        1677.18)),
+                ('miles', 995.000000,
+                    ('days', 12.500000,
+                        ('miles', 774.000000,
+                            1774.64,
+                            ('receipts', 1758.599976,
+                                1876.53,
+                                1802.38)),
+                        1900.41),
+                    ('miles_receipts_scaled', 1842.686523,
+                        2033.30,
+                        1882.41)))))
+)
+
+
+def _tree_features(days, miles, receipts):
+    """Feature arrays used by the tree splits"""
+    import numpy as np
+    
+    return {
+        'days': days,
+        'miles': miles,
+        'receipts': receipts,
+        'inv_receipts': 1 / (1 + receipts),
+        'three_way': days * miles * receipts / 1000,
+        'log_receipts': np.log1p(receipts),
+        'days_miles': days * miles,
+        'receipts_sq_scaled': receipts ** 2 / 1e6,
+        'days_receipts': days * receipts,
+        'miles_receipts_scaled': miles * receipts / 1000,
+        # Cents part of the receipts for the 49/99 ending adjustment; it only
+        # takes values 0-99, so it is kept as one byte per trip
+        'cents': ((receipts * 100).astype(np.int64) % 100).astype(np.uint8),
+    }
+
+
+def _tree_leaves(node, features, mask=None):
+    """Yield (rows reaching the leaf, leaf value) for every leaf of the tree"""
+    if not isinstance(node, tuple):
+        yield mask, node
+        return
+    feature, threshold, left, right = node
+    goes_left = features[feature] <= threshold
+    yield from _tree_leaves(left, features, goes_left if mask is None else mask & goes_left)
+    yield from _tree_leaves(right, features, ~goes_left if mask is None else mask & ~goes_left)
+
+
+def calculate_reimbursement_batch(days_arr, miles_arr, receipts_arr):
+    """
+    Vectorized calculate_reimbursement over arrays of trips.
+    
+    numpy is imported here rather than at module level so the scalar CLI
+    path stays pure Python (and runs unchanged under PyPy).
+    """
+    import numpy as np
+    
+    days = np.asarray(days_arr, dtype=np.int64).astype(np.float64)
+    miles = np.asarray(miles_arr, dtype=np.float64)
+    receipts = np.asarray(receipts_arr, dtype=np.float64)
+    
+    # Every split is compared once over all trips and each leaf's path is a
+    # mask; np.select then picks the leaf value per trip with no per-trip
+    # branching or regrouping of row indices
+    features = _tree_features(days, miles, receipts)
+    masks, values = zip(*_tree_leaves(_TREE, features))
+    result = np.select(masks, values)
+    
+    result += np.array(CENTS_ADJUSTMENT)[features['cents']] + 10 * (days == 5)
+    
+    return np.round(result, 2)
+
 if __name__ == "__main__":
     if len(sys.argv) != 4:
         print("Usage: calculate_reimbursement_tree.py <days> <miles> <receipts>")
@@ -14,6 +14,13 @@ df = pd.DataFrame([{
     'output': case['expected_output']
 } for case in data])
 
+# Column arrays for the per-case formulas below, so no pandas rows are
+# built inside the parameter sweeps
+days_arr = df['days'].to_numpy(dtype=np.float64)
+miles_arr = df['miles'].to_numpy(dtype=np.float64)
+receipts_arr = df['receipts'].to_numpy(dtype=np.float64)
+output_arr = df['output'].to_numpy(dtype=np.float64)
+
 print("=== DAY PATTERN ANALYSIS ===")
 
 # The residual pattern shows that longer trips get LESS than a linear rate
@@ -68,22 +75,16 @@ def test_custom_day_rates():
     receipt_factor = 0.41
     mile_factor = 0.35
     
-    predicted_outputs = []
-    for _, row in df.iterrows():
-        days = row['days']
-        if days in day_rates:
-            base_component = day_rates[days] * days
-        else:
-            # For days not in our lookup, interpolate or use a fallback
-            base_component = 100 * days  # fallback
-        
-        receipt_component = receipt_factor * row['receipts']
-        mile_component = mile_factor * row['miles']
-        
-        predicted = base_component + receipt_component + mile_component
-        predicted_outputs.append(predicted)
+    # Look the rate up once per distinct trip length
+    # For days not in our lookup, interpolate or use a fallback
+    unique_days, day_index = np.unique(days_arr, return_inverse=True)
+    rates = np.array([day_rates.get(days, 100) for days in unique_days], dtype=np.float64)[day_index]  # 100/day fallback
+    
+    base_component = rates * days_arr
+    receipt_component = receipt_factor * receipts_arr
+    mile_component = mile_factor * miles_arr
     
-    df['predicted_custom'] = predicted_outputs
+    df['predicted_custom'] = base_component + receipt_component + mile_component
     df['error_custom'] = abs(df['predicted_custom'] - df['output'])
     
     print(f"\nCustom day rate formula results:")
@@ -131,22 +132,18 @@ def test_rate_formula(base_rate, penalty_per_day):
     receipt_factor = 0.41
     mile_factor = 0.35
     
-    predicted_outputs = []
-    for _, row in df.iterrows():
-        days = row['days']
-        effective_rate = base_rate - penalty_per_day * (days - 1)
-        
-        base_component = effective_rate * days
-        receipt_component = receipt_factor * row['receipts']
-        mile_component = mile_factor * row['miles']
-        
-        predicted = base_component + receipt_component + mile_component
-        predicted_outputs.append(predicted)
+    effective_rate = base_rate - penalty_per_day * (days_arr - 1)
+    
+    base_component = effective_rate * days_arr
+    receipt_component = receipt_factor * receipts_arr
+    mile_component = mile_factor * miles_arr
+    
+    predicted_outputs = base_component + receipt_component + mile_component
     
-    errors = [abs(pred - actual) for pred, actual in zip(predicted_outputs, df['output'])]
-    max_error = max(errors)
-    mean_error = sum(errors) / len(errors)
-    perfect_matches = sum(1 for e in errors if e < 0.01)
+    errors = np.abs(predicted_outputs - output_arr)
+    max_error = errors.max()
+    mean_error = errors.mean()
+    perfect_matches = np.count_nonzero(errors < 0.01)
     
     print(f"    Formula: ({base_rate} - {penalty_per_day} * (days-1)) * days + {receipt_factor} * receipts + {mile_factor} * miles")
     print(f"    Max error: {max_error:.6f}, Mean error: {mean_error:.6f}, Perfect matches: {perfect_matches}")
@@ -6,6 +6,7 @@ Debug version to understand why we're only getting 115 matches instead of 860
 import json
 import sys
 import math
+import functools
 
 # Load test data
 with open('public_cases.json', 'r') as f:
@@ -132,6 +133,16 @@ def apply_formula(formula, days, miles, receipts):
         print(f"Formula application failed for {formula_type}: {e}")
         return None
 
+@functools.lru_cache(maxsize=None)
+def case_number_result(case_num):
+    """Result of the formula stored under case_num, applied to that case's inputs"""
+    # Both passes below need this for the same cases, so it is computed once
+    input_data = test_data[case_num - 1]['input']
+    return apply_formula(formula_by_case[case_num],
+                         input_data['trip_duration_days'],
+                         input_data['miles_traveled'],
+                         input_data['total_receipts_amount'])
+
 # Test our current ultimate logic
 exact_matches = 0
 failed_applications = 0
@@ -171,8 +182,7 @@ for i, case in enumerate(test_data):
     if not found_exact:
         # Check if we have a formula by case number
         if case_num in formula_by_case:
-            formula = formula_by_case[case_num]
-            result = apply_formula(formula, days, miles, receipts)
+            result = case_number_result(case_num)
             if result is not None:
                 error = abs(result - expected)
                 if error < 0.01:
@@ -208,7 +218,7 @@ for i, case in enumerate(test_data):
     # Use case number lookup
     if case_num in formula_by_case:
         formula = formula_by_case[case_num]
-        result = apply_formula(formula, days, miles, receipts)
+        result = case_number_result(case_num)
         if result is not None:
             successful_formula_apps += 1
             error = abs(result - expected)
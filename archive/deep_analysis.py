@@ -15,6 +15,25 @@ df = pd.DataFrame([{
     'output': case['expected_output']
 } for case in data])
 
+# Input columns as float arrays, shared by every formula scored below
+days_arr = df['days'].to_numpy(dtype=np.float64)
+miles_arr = df['miles'].to_numpy(dtype=np.float64)
+receipts_arr = df['receipts'].to_numpy(dtype=np.float64)
+output_arr = df['output'].to_numpy(dtype=np.float64)
+
+def linear_prediction(base, receipt_factor, mile_factor=0):
+    """base * days + receipts * receipt_factor + miles * mile_factor per case (factors may broadcast)"""
+    return base * days_arr + receipts_arr * receipt_factor + miles_arr * mile_factor
+
+def grid_rmse(inputs, *factor_ranges):
+    """RMSE of sum(factor * input) for every combination of the factor ranges, with the factor grids"""
+    # Each combination is one column of the (inputs x combinations) factor
+    # matrix, so every prediction comes out of a single matrix product
+    factor_grids = np.meshgrid(*factor_ranges, indexing='ij')
+    factors = np.stack([grid.ravel() for grid in factor_grids]).astype(np.float64)
+    residuals = np.column_stack(inputs) @ factors - output_arr[:, None]
+    return np.sqrt((residuals ** 2).mean(axis=0)), factor_grids
+
 print("=== DEEP MATHEMATICAL ANALYSIS ===")
 
 # The correlation with receipts is very high (0.704) - this suggests receipts are a major component
@@ -63,17 +82,10 @@ print("\n=== SYSTEMATIC FORMULA TESTING ===")
 
 # Test formula: base * days + receipts * days * factor
 def test_formula_systematic():
-    best_error = float('inf')
-    best_params = None
-    
-    for base in range(80, 201, 10):
-        for factor in range(50, 151, 5):
-            predicted = base * df['days'] + df['receipts'] * factor
-            error = ((predicted - df['output']) ** 2).mean() ** 0.5  # RMSE
-            
-            if error < best_error:
-                best_error = error
-                best_params = (base, factor)
+    rmse, (bases, factors) = grid_rmse([days_arr, receipts_arr], np.arange(80, 201, 10), np.arange(50, 151, 5))
+    best = rmse.argmin()
+    best_error = rmse[best]
+    best_params = (bases.flat[best].item(), factors.flat[best].item())
     
     print(f"Best base + receipts*factor: base={best_params[0]}, factor={best_params[1]}, RMSE={best_error:.3f}")
     return best_params
@@ -81,7 +93,7 @@ def test_formula_systematic():
 best_base, best_factor = test_formula_systematic()
 
 # Test the best formula
-df['predicted_best'] = best_base * df['days'] + df['receipts'] * best_factor
+df['predicted_best'] = linear_prediction(best_base, best_factor)
 df['error_best'] = abs(df['predicted_best'] - df['output'])
 print(f"Best formula max error: {df['error_best'].max():.3f}")
 print(f"Best formula mean error: {df['error_best'].mean():.3f}")
@@ -91,18 +103,11 @@ print("\n=== TESTING MILES COMPONENT ===")
 
 # Maybe it's: base * days + receipts * factor + miles * mile_factor
 def test_three_component():
-    best_error = float('inf')
-    best_params = None
-    
-    for base in range(50, 151, 20):
-        for receipt_factor in range(70, 131, 10):
-            for mile_factor in range(1, 21, 2):
-                predicted = base * df['days'] + df['receipts'] * receipt_factor + df['miles'] * mile_factor
-                error = ((predicted - df['output']) ** 2).mean() ** 0.5
-                
-                if error < best_error:
-                    best_error = error
-                    best_params = (base, receipt_factor, mile_factor)
+    rmse, (bases, receipt_factors, mile_factors) = grid_rmse(
+        [days_arr, receipts_arr, miles_arr], np.arange(50, 151, 20), np.arange(70, 131, 10), np.arange(1, 21, 2))
+    best = rmse.argmin()
+    best_error = rmse[best]
+    best_params = (bases.flat[best].item(), receipt_factors.flat[best].item(), mile_factors.flat[best].item())
     
     print(f"Best 3-component: base={best_params[0]}, receipt_factor={best_params[1]}, mile_factor={best_params[2]}, RMSE={best_error:.3f}")
     return best_params
@@ -110,7 +115,7 @@ def test_three_component():
 best_base3, best_receipt_factor3, best_mile_factor3 = test_three_component()
 
 # Test this formula
-df['predicted_3comp'] = best_base3 * df['days'] + df['receipts'] * best_receipt_factor3 + df['miles'] * best_mile_factor3
+df['predicted_3comp'] = linear_prediction(best_base3, best_receipt_factor3, best_mile_factor3)
 df['error_3comp'] = abs(df['predicted_3comp'] - df['output'])
 print(f"3-component formula max error: {df['error_3comp'].max():.3f}")
 print(f"3-component formula mean error: {df['error_3comp'].mean():.3f}")
@@ -119,6 +124,11 @@ print(f"3-component formula mean error: {df['error_3comp'].mean():.3f}")
 print("\n=== TESTING HIGH-PRECISION FORMULAS ===")
 
 # Test with decimal precision
+def precise_max_errors(base, receipt_range, mile_range):
+    """Max error of every (receipt_factor, mile_factor) pair for one base value"""
+    predicted = linear_prediction(base, receipt_range[:, None, None], mile_range[None, :, None])
+    return np.abs(predicted - output_arr).max(axis=-1)
+
 def test_precise_formula():
     best_error = float('inf')
     best_params = None
@@ -128,19 +138,20 @@ def test_precise_formula():
     receipt_range = np.arange(best_receipt_factor3 - 10, best_receipt_factor3 + 11, 0.5)
     mile_range = np.arange(best_mile_factor3 - 2, best_mile_factor3 + 3, 0.1)
     
+    # Each base value's whole receipt x mile grid is scored in one broadcast
     for base in base_range:
-        for receipt_factor in receipt_range:
-            for mile_factor in mile_range:
-                predicted = base * df['days'] + df['receipts'] * receipt_factor + df['miles'] * mile_factor
-                max_error = abs(predicted - df['output']).max()
-                
-                if max_error < best_error:
-                    best_error = max_error
-                    best_params = (base, receipt_factor, mile_factor)
-                
-                if max_error < 0.01:  # Perfect match
-                    print(f"EXACT MATCH FOUND: base={base:.1f}, receipt_factor={receipt_factor:.1f}, mile_factor={mile_factor:.1f}")
-                    return base, receipt_factor, mile_factor
+        max_errors = precise_max_errors(base, receipt_range, mile_range)
+        exact = np.flatnonzero(max_errors < 0.01)
+        if len(exact) > 0:  # Perfect match
+            i, j = np.unravel_index(exact[0], max_errors.shape)
+            receipt_factor, mile_factor = receipt_range[i], mile_range[j]
+            print(f"EXACT MATCH FOUND: base={base:.1f}, receipt_factor={receipt_factor:.1f}, mile_factor={mile_factor:.1f}")
+            return base, receipt_factor, mile_factor
+        
+        i, j = np.unravel_index(max_errors.argmin(), max_errors.shape)
+        if max_errors[i, j] < best_error:
+            best_error = max_errors[i, j]
+            best_params = (base, receipt_range[i], mile_range[j])
     
     print(f"Best precise formula: base={best_params[0]:.1f}, receipt_factor={best_params[1]:.1f}, mile_factor={best_params[2]:.1f}, max_error={best_error:.6f}")
     return best_params
@@ -159,9 +170,9 @@ business_tests = [
 ]
 
 for base, receipt_factor, mile_factor in business_tests:
-    predicted = base * df['days'] + df['receipts'] * receipt_factor + df['miles'] * mile_factor
-    max_error = abs(predicted - df['output']).max()
-    mean_error = abs(predicted - df['output']).mean()
+    predicted = linear_prediction(base, receipt_factor, mile_factor)
+    max_error = abs(predicted - output_arr).max()
+    mean_error = abs(predicted - output_arr).mean()
     print(f"Base {base}, Receipt factor {receipt_factor}, Mile factor {mile_factor}: Max error {max_error:.3f}, Mean error {mean_error:.3f}")
 
 # Let's examine edge cases to understand the formula better
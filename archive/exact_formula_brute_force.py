@@ -20,11 +20,17 @@ print("=== EXACT FORMULA BRUTE FORCE SEARCH ===")
 # Since there must be an exact analytical function, let me try ALL reasonable combinations
 # with high precision
 
-def test_formula_exact(base_rate, receipt_factor, mile_factor):
-    """Test exact formula: base_rate * days + receipt_factor * receipts + mile_factor * miles"""
-    predicted = base_rate * df['days'] + receipt_factor * df['receipts'] + mile_factor * df['miles']
-    max_error = abs(predicted - df['output']).max()
-    return max_error
+days_arr = df['days'].to_numpy(dtype=np.float64)
+receipts_arr = df['receipts'].to_numpy(dtype=np.float64)
+miles_arr = df['miles'].to_numpy(dtype=np.float64)
+output_arr = df['output'].to_numpy(dtype=np.float64)
+
+def test_formula_exact(base_rate):
+    """Max error of base_rate * days + receipt_factor * receipts + mile_factor * miles for every factor pair"""
+    # One base rate's (receipt, mile, case) grid is ~66 MB, so memory stays
+    # flat however many base rates are searched
+    predicted = (base_rate * days_arr + receipt_factors[:, None, None] * receipts_arr) + mile_factors[None, :, None] * miles_arr
+    return np.abs(predicted - output_arr).max(axis=-1)
 
 print("Brute force searching for EXACT formula (max error < 0.01)...")
 print("This will test thousands of combinations...")
@@ -43,22 +49,20 @@ print(f"Testing {total_combinations:,} combinations...")
 
 tested = 0
 for base_rate in base_rates:
+    max_errors = test_formula_exact(base_rate)
     if tested % 10000 == 0:
         print(f"Tested {tested:,} combinations... Best error so far: {best_error:.6f}")
+    tested += max_errors.size
     
-    for receipt_factor in receipt_factors:
-        for mile_factor in mile_factors:
-            tested += 1
-            
-            max_error = test_formula_exact(base_rate, receipt_factor, mile_factor)
-            
-            if max_error < best_error:
-                best_error = max_error
-                best_formula = (base_rate, receipt_factor, mile_factor)
-            
-            if max_error < 0.01:  # Exact match!
-                exact_matches.append((base_rate, receipt_factor, mile_factor, max_error))
-                print(f"EXACT MATCH: base={base_rate:.1f}, receipt={receipt_factor:.2f}, mile={mile_factor:.2f}, error={max_error:.6f}")
+    i, j = np.unravel_index(max_errors.argmin(), max_errors.shape)
+    if max_errors[i, j] < best_error:
+        best_error = max_errors[i, j]
+        best_formula = (base_rate, receipt_factors[i], mile_factors[j])
+    
+    for i, j in np.argwhere(max_errors < 0.01):  # Exact match!
+        receipt_factor, mile_factor, max_error = receipt_factors[i], mile_factors[j], max_errors[i, j]
+        exact_matches.append((base_rate, receipt_factor, mile_factor, max_error))
+        print(f"EXACT MATCH: base={base_rate:.1f}, receipt={receipt_factor:.2f}, mile={mile_factor:.2f}, error={max_error:.6f}")
 
 print(f"\nCompleted brute force search!")
 print(f"Total combinations tested: {tested:,}")
@@ -127,14 +131,11 @@ if not exact_matches:
             for c in range(50, 151, 10):
                 for d in range(0, 21, 5):
                     for e in range(0, 11, 1):
-                        try:
-                            predicted = (a + b * df['receipts']) * (c + d * df['days']) + e * df['miles']
-                            max_error = abs(predicted - df['output']).max()
-                            
-                            if max_error < 1.0:
-                                print(f"  ({a} + {b} * receipts) * ({c} + {d} * days) + {e} * miles -> error: {max_error:.3f}")
-                        except:
-                            continue
+                        predicted = (a + b * df['receipts']) * (c + d * df['days']) + e * df['miles']
+                        max_error = abs(predicted - df['output']).max()
+                        
+                        if max_error < 1.0:
+                            print(f"  ({a} + {b} * receipts) * ({c} + {d} * days) + {e} * miles -> error: {max_error:.3f}")
 
 print("\nSaving brute force results...")
 if exact_matches:
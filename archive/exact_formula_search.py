@@ -119,18 +119,37 @@ for base_rate, receipt_factor, mile_factor in business_values:
 # Let's also search for integer values that might be the exact formula
 print(f"\n=== TESTING INTEGER COEFFICIENTS ===")
 
+# For each base rate, score the whole (receipt, mile) grid against every
+# case in one broadcast instead of a pandas expression per combination
+days = df['days'].to_numpy(dtype=np.float64)
+receipts = df['receipts'].to_numpy(dtype=np.float64)
+miles = df['miles'].to_numpy(dtype=np.float64)
+output = df['output'].to_numpy(dtype=np.float64)
+
+receipt_factor_grid = (np.arange(40, 51) / 100.0)[:, None, None]  # 0.40 to 0.50
+mile_factor_grid = (np.arange(30, 71) / 100.0)[None, :, None]  # 0.30 to 0.70
+
+# Receipts and miles are non-negative, so with the factors confined to their
+# grids every case bounds what is left once the day term is taken off. A base
+# rate that leaves any case's remainder more than the exact-match tolerance
+# outside those bounds cannot match exactly, and its grid is skipped
+low_rates = receipt_factor_grid.min() * receipts + mile_factor_grid.min() * miles
+high_rates = receipt_factor_grid.max() * receipts + mile_factor_grid.max() * miles
+slack = 0.01 + 1e-9  # headroom for rounding in the grid's own arithmetic
+
 for base_rate in range(100, 151):
-    for receipt_factor_int in range(40, 51):  # 0.40 to 0.50 as integers * 100
-        for mile_factor_int in range(30, 71):  # 0.30 to 0.70 as integers * 100
-            receipt_factor = receipt_factor_int / 100.0
-            mile_factor = mile_factor_int / 100.0
-            
-            predicted = base_rate * df['days'] + receipt_factor * df['receipts'] + mile_factor * df['miles']
-            max_error = abs(predicted - df['output']).max()
-            
-            if max_error < 0.01:
-                print(f"EXACT INTEGER MATCH: base={base_rate}, receipt_factor={receipt_factor:.2f}, mile_factor={mile_factor:.2f}")
-                print(f"Max error: {max_error:.6f}")
+    remainder = output - base_rate * days
+    if (remainder < low_rates - slack).any() or (remainder > high_rates + slack).any():
+        continue
+    
+    predicted = base_rate * days + receipt_factor_grid * receipts + mile_factor_grid * miles
+    max_errors = np.abs(predicted - output).max(axis=-1)
+    
+    for r, m in np.argwhere(max_errors < 0.01):
+        receipt_factor = receipt_factor_grid[r, 0, 0]
+        mile_factor = mile_factor_grid[0, m, 0]
+        print(f"EXACT INTEGER MATCH: base={base_rate}, receipt_factor={receipt_factor:.2f}, mile_factor={mile_factor:.2f}")
+        print(f"Max error: {max_errors[r, m]:.6f}")
 
 print("\nSaving exact formula search results...")
 if 'predicted' in df.columns:
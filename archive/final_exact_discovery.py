@@ -179,19 +179,30 @@ best_error = float('inf')
 best_formula = None
 
 # Search in a small range around the least squares solution
-for days_coeff in np.arange(ls_days - 5, ls_days + 6, 0.1):
-    for receipts_coeff in np.arange(ls_receipts - 0.1, ls_receipts + 0.11, 0.01):
-        for miles_coeff in np.arange(ls_miles - 0.1, ls_miles + 0.11, 0.01):
-            predicted = days_coeff * df['days'] + receipts_coeff * df['receipts'] + miles_coeff * df['miles']
-            max_error = abs(predicted - df['output']).max()
-            
-            if max_error < best_error:
-                best_error = max_error
-                best_formula = (days_coeff, receipts_coeff, miles_coeff)
-            
-            if max_error < 0.01:
-                print(f"EXACT: {days_coeff:.1f} * days + {receipts_coeff:.2f} * receipts + {miles_coeff:.2f} * miles")
-                print(f"Max error: {max_error:.6f}")
+days_coeffs = np.arange(ls_days - 5, ls_days + 6, 0.1)
+receipts_coeffs = np.arange(ls_receipts - 0.1, ls_receipts + 0.11, 0.01)
+miles_coeffs = np.arange(ls_miles - 0.1, ls_miles + 0.11, 0.01)
+
+days_arr = df['days'].to_numpy(dtype=np.float64)
+receipts_arr = df['receipts'].to_numpy(dtype=np.float64)
+miles_arr = df['miles'].to_numpy(dtype=np.float64)
+output_arr = df['output'].to_numpy(dtype=np.float64)
+
+def precision_max_errors(days_coeff):
+    """Max error of every (receipts_coeff, miles_coeff) pair at one days coefficient"""
+    predicted = (days_coeff * days_arr + receipts_coeffs[:, None, None] * receipts_arr) + miles_coeffs[None, :, None] * miles_arr
+    return np.abs(predicted - output_arr).max(axis=-1)
+
+for days_coeff in days_coeffs:
+    max_errors = precision_max_errors(days_coeff)
+    i, j = np.unravel_index(max_errors.argmin(), max_errors.shape)
+    if max_errors[i, j] < best_error:
+        best_error = max_errors[i, j]
+        best_formula = (days_coeff, receipts_coeffs[i], miles_coeffs[j])
+    
+    for i, j in np.argwhere(max_errors < 0.01):
+        print(f"EXACT: {days_coeff:.1f} * days + {receipts_coeffs[i]:.2f} * receipts + {miles_coeffs[j]:.2f} * miles")
+        print(f"Max error: {max_errors[i, j]:.6f}")
 
 print(f"\nBest formula found in precision search:")
 if best_formula:
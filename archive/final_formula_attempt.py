@@ -87,19 +87,16 @@ for a in range(0, 101, 20):
         for c in range(1, 11, 2):
             for d in range(10, 51, 10):
                 for e in [0, 0.1, 0.2, 0.3, 0.4, 0.5]:
-                    try:
-                        predicted_mult = (a + b * df['receipts']) * (c + d * df['days']) + e * df['miles']
-                        max_error_mult = abs(predicted_mult - df['output']).max()
-                        
-                        if max_error_mult < best_mult_error:
-                            best_mult_error = max_error_mult
-                            if max_error_mult < 100:  # Good enough to report
-                                print(f"({a} + {b}*receipts) * ({c} + {d}*days) + {e}*miles -> max error: {max_error_mult:.3f}")
-                        
-                        if max_error_mult < 0.01:
-                            print(f"*** EXACT MULTIPLICATIVE FORMULA: ({a} + {b}*receipts) * ({c} + {d}*days) + {e}*miles ***")
-                    except:
-                        continue
+                    predicted_mult = (a + b * df['receipts']) * (c + d * df['days']) + e * df['miles']
+                    max_error_mult = abs(predicted_mult - df['output']).max()
+                    
+                    if max_error_mult < best_mult_error:
+                        best_mult_error = max_error_mult
+                        if max_error_mult < 100:  # Good enough to report
+                            print(f"({a} + {b}*receipts) * ({c} + {d}*days) + {e}*miles -> max error: {max_error_mult:.3f}")
+                    
+                    if max_error_mult < 0.01:
+                        print(f"*** EXACT MULTIPLICATIVE FORMULA: ({a} + {b}*receipts) * ({c} + {d}*days) + {e}*miles ***")
 
 # Let me try one more approach - maybe it's a lookup table based on rounded values
 print(f"\n=== TESTING LOOKUP TABLE HYPOTHESIS ===")
@@ -128,29 +125,41 @@ test_rounded_inputs()
 print(f"\n=== TESTING INTEGER COEFFICIENTS ===")
 
 # Test simple integer coefficients
-best_int_error = float('inf')
-best_int_formula = None
-
-for days_coeff in range(50, 101):
-    for receipts_coeff_int in range(30, 61):  # 0.30 to 0.60 as integers/100
-        for miles_coeff_int in range(40, 81):  # 0.40 to 0.80 as integers/100
-            receipts_coeff = receipts_coeff_int / 100.0
-            miles_coeff = miles_coeff_int / 100.0
-            
-            predicted_int = days_coeff * df['days'] + receipts_coeff * df['receipts'] + miles_coeff * df['miles']
-            max_error_int = abs(predicted_int - df['output']).max()
-            perfect_matches_int = (abs(predicted_int - df['output']) < 0.01).sum()
-            
-            if max_error_int < best_int_error:
-                best_int_error = max_error_int
-                best_int_formula = (days_coeff, receipts_coeff, miles_coeff)
-            
-            if perfect_matches_int > 115:  # Better than current
-                print(f"Integer formula: {days_coeff} * days + {receipts_coeff:.2f} * receipts + {miles_coeff:.2f} * miles")
-                print(f"  Perfect matches: {perfect_matches_int}, Max error: {max_error_int:.6f}")
-            
-            if max_error_int < 0.01:
-                print(f"*** EXACT INTEGER FORMULA: {days_coeff} * days + {receipts_coeff:.2f} * receipts + {miles_coeff:.2f} * miles ***")
+# Days take integer coefficients; receipts and miles take hundredths
+# (0.30 to 0.60 and 0.40 to 0.80)
+days_coeffs = np.arange(50, 101)
+receipts_coeffs = np.arange(30, 61) / 100.0
+miles_coeffs = np.arange(40, 81) / 100.0
+
+# Cases are scored against the whole coefficient grid in tiles of 64, each
+# one (case, days, receipts, miles) tensor of about 33 MB; a tile's max error
+# and perfect-match count are folded into the per-formula totals
+tile_size = 64
+case_rows = df[['days', 'receipts', 'miles', 'output']].to_numpy(dtype=np.float64)
+max_error_grid = np.zeros((len(days_coeffs), len(receipts_coeffs), len(miles_coeffs)))
+perfect_grid = np.zeros(max_error_grid.shape, dtype=np.int64)
+for start in range(0, len(case_rows), tile_size):
+    days, receipts, miles, output = (column[:, None, None, None] for column in case_rows[start:start + tile_size].T)
+    tile_error = np.abs(days_coeffs[None, :, None, None] * days
+                        + receipts_coeffs[None, None, :, None] * receipts
+                        + miles_coeffs[None, None, None, :] * miles - output)
+    np.maximum(max_error_grid, tile_error.max(axis=0), out=max_error_grid)
+    perfect_grid += np.count_nonzero(tile_error < 0.01, axis=0)
+
+# Report formulas in the same days -> receipts -> miles order as the grid
+for flat in np.flatnonzero((perfect_grid > 115) | (max_error_grid < 0.01)):
+    d, r, m = np.unravel_index(flat, max_error_grid.shape)
+    days_coeff, receipts_coeff, miles_coeff = days_coeffs[d], receipts_coeffs[r], miles_coeffs[m]
+    if perfect_grid[d, r, m] > 115:  # Better than current
+        print(f"Integer formula: {days_coeff} * days + {receipts_coeff:.2f} * receipts + {miles_coeff:.2f} * miles")
+        print(f"  Perfect matches: {perfect_grid[d, r, m]}, Max error: {max_error_grid[d, r, m]:.6f}")
+    
+    if max_error_grid[d, r, m] < 0.01:
+        print(f"*** EXACT INTEGER FORMULA: {days_coeff} * days + {receipts_coeff:.2f} * receipts + {miles_coeff:.2f} * miles ***")
+
+d, r, m = np.unravel_index(max_error_grid.argmin(), max_error_grid.shape)
+best_int_error = max_error_grid[d, r, m]
+best_int_formula = (days_coeffs[d].item(), receipts_coeffs[r].item(), miles_coeffs[m].item())
 
 print(f"\nBest integer formula found:")
 if best_int_formula:
@@ -119,26 +119,25 @@ def test_complete_formula():
     best_overall_error = float('inf')
     best_overall_params = None
     
+    # The day rate only depends on the trip length, so the best function is
+    # evaluated once per distinct length and every case gets its base
+    # component up front; each factor pair is then one pass over the columns
+    days = df['days'].to_numpy(dtype=np.float64)
+    receipts = df['receipts'].to_numpy(dtype=np.float64)
+    miles = df['miles'].to_numpy(dtype=np.float64)
+    output = df['output'].to_numpy(dtype=np.float64)
+    
+    unique_days, day_index = np.unique(days, return_inverse=True)
+    unique_day_rates = np.array([best_func(d, *best_params) for d in unique_days.tolist()])
+    base_components = unique_day_rates[day_index] * days
+    
     for receipt_factor in [0.40, 0.41, 0.42, 0.43, 0.44, 0.45]:
         for mile_factor in [0.30, 0.35, 0.40, 0.45, 0.50]:
-            predicted_outputs = []
-            
-            for _, row in df.iterrows():
-                days = row['days']
-                
-                # Calculate day rate using best function
-                day_rate = best_func(days, *best_params)
-                
-                base_component = day_rate * days
-                receipt_component = receipt_factor * row['receipts']
-                mile_component = mile_factor * row['miles']
-                
-                predicted = base_component + receipt_component + mile_component
-                predicted_outputs.append(predicted)
+            predicted = base_components + receipt_factor * receipts + mile_factor * miles
             
-            errors = [abs(pred - actual) for pred, actual in zip(predicted_outputs, df['output'])]
-            max_error = max(errors)
-            mean_error = sum(errors) / len(errors)
+            errors = np.abs(predicted - output)
+            max_error = errors.max()
+            mean_error = errors.mean()
             
             if max_error < best_overall_error:
                 best_overall_error = max_error
@@ -152,20 +151,8 @@ def test_complete_formula():
     
     # Test the best combination
     receipt_factor, mile_factor = best_overall_params
-    predicted_outputs = []
-    
-    for _, row in df.iterrows():
-        days = row['days']
-        day_rate = best_func(days, *best_params)
-        
-        base_component = day_rate * days
-        receipt_component = receipt_factor * row['receipts']
-        mile_component = mile_factor * row['miles']
-        
-        predicted = base_component + receipt_component + mile_component
-        predicted_outputs.append(predicted)
     
-    df['predicted_final'] = predicted_outputs
+    df['predicted_final'] = base_components + receipt_factor * receipts + mile_factor * miles
     df['error_final'] = abs(df['predicted_final'] - df['output'])
     
     print(f"\nFinal formula results:")
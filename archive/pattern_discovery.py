@@ -15,6 +15,11 @@ df = pd.DataFrame([{
     'output': case['expected_output']
 } for case in data])
 
+# Per-day rates used by the analyses below, derived once; they are kept off
+# df so the saved pattern analysis keeps its original columns
+miles_per_day = df['miles'] / df['days']
+receipts_per_day = df['receipts'] / df['days']
+
 print("=== PATTERN DISCOVERY ANALYSIS ===")
 
 # Let's look at the exact patterns by examining specific relationships
@@ -147,15 +152,15 @@ print("\n=== TESTING INTERVIEW INSIGHTS ===")
 print("Testing Kevin's 'sweet spot' theory:")
 sweet_spot_cases = df[
     (df['days'] == 5) & 
-    (df['miles'] / df['days'] >= 180) & 
-    (df['receipts'] / df['days'] <= 100)
+    (miles_per_day >= 180) & 
+    (receipts_per_day <= 100)
 ]
 print(f"Sweet spot cases: {len(sweet_spot_cases)}")
 if len(sweet_spot_cases) > 0:
     print("Sweet spot case details:")
-    for _, row in sweet_spot_cases.head(10).iterrows():
-        efficiency = row['miles'] / row['days']
-        spending_per_day = row['receipts'] / row['days']
+    for i, row in sweet_spot_cases.head(10).iterrows():
+        efficiency = miles_per_day[i]
+        spending_per_day = receipts_per_day[i]
         print(f"  Miles/day: {efficiency:.1f}, Spending/day: ${spending_per_day:.2f}, Output: ${row['output']:.2f}")
 
 # Let's examine the exact relationship by looking at simpler cases first
@@ -84,18 +84,19 @@ day_bases = {
     8: 89, 9: 84, 10: 76, 11: 74, 12: 69, 13: 72, 14: 67
 }
 
+# Input columns and every case's looked-up base (base_per_day[days] * days),
+# shared by the formula tests below; errors are then reduced with numpy
+# rather than max()/sum() over Python lists
+days_arr = df['days'].to_numpy(dtype=np.float64)
+receipts_arr = df['receipts'].to_numpy(dtype=np.float64)
+miles_arr = df['miles'].to_numpy(dtype=np.float64)
+output_arr = df['output'].to_numpy(dtype=np.float64)
+lookup_base = np.array([day_bases.get(days, 100) for days in df['days'].tolist()]) * days_arr  # fallback to 100 if day not in lookup
+
 def test_lookup_formula():
-    predicted_outputs = []
     receipt_factor = 0.7
     
-    for _, row in df.iterrows():
-        days = row['days']
-        base_rate = day_bases.get(days, 100)  # fallback to 100 if day not in lookup
-        
-        predicted = base_rate * days + receipt_factor * row['receipts']
-        predicted_outputs.append(predicted)
-    
-    df['predicted_lookup'] = predicted_outputs
+    df['predicted_lookup'] = lookup_base + receipt_factor * receipts_arr
     df['error_lookup'] = abs(df['predicted_lookup'] - df['output'])
     
     print(f"Lookup table formula (base_per_day[days] * days + 0.7 * receipts):")
@@ -117,18 +118,11 @@ def test_three_component_simple():
     # Test simple integer-like values
     for receipt_factor in [0.6, 0.65, 0.7, 0.75, 0.8]:
         for mile_factor in [0.1, 0.2, 0.3, 0.4, 0.5]:
-            predicted_outputs = []
+            predicted = lookup_base + receipt_factor * receipts_arr + mile_factor * miles_arr
             
-            for _, row in df.iterrows():
-                days = row['days']
-                base_rate = day_bases.get(days, 100)
-                
-                predicted = base_rate * days + receipt_factor * row['receipts'] + mile_factor * row['miles']
-                predicted_outputs.append(predicted)
-            
-            errors = [abs(pred - actual) for pred, actual in zip(predicted_outputs, df['output'])]
-            max_error = max(errors)
-            mean_error = sum(errors) / len(errors)
+            errors = np.abs(predicted - output_arr)
+            max_error = errors.max()
+            mean_error = errors.mean()
             
             if max_error < best_error:
                 best_error = max_error
@@ -155,17 +149,9 @@ def precise_search():
     
     for receipt_factor in receipt_range:
         for mile_factor in mile_range:
-            predicted_outputs = []
-            
-            for _, row in df.iterrows():
-                days = row['days']
-                base_rate = day_bases.get(days, 100)
-                
-                predicted = base_rate * days + receipt_factor * row['receipts'] + mile_factor * row['miles']
-                predicted_outputs.append(predicted)
+            predicted = lookup_base + receipt_factor * receipts_arr + mile_factor * miles_arr
             
-            errors = [abs(pred - actual) for pred, actual in zip(predicted_outputs, df['output'])]
-            max_error = max(errors)
+            max_error = np.abs(predicted - output_arr).max()
             
             if max_error < best_error:
                 best_error = max_error
@@ -14,6 +14,15 @@ df = pd.DataFrame([{
     'output': case['expected_output']
 } for case in data])
 
+# Per-day rates and the trip masks the scans below filter on, built once as
+# numpy arrays and passed in rather than recomputed inside each scan
+days_arr = df['days'].to_numpy()
+output_arr = df['output'].to_numpy()
+efficiency = df['miles'].to_numpy() / days_arr
+spending_per_day = df['receipts'].to_numpy() / days_arr
+masks = {f'days_{days}': days_arr == days for days in range(1, 6)}
+masks['sweet_spot'] = (efficiency >= 180) & (efficiency <= 220)
+
 print("=== SIMPLE PATTERN CHECK ===")
 
 # Let me step back and look for very simple patterns
@@ -52,12 +61,12 @@ test_simple_formulas()
 print(f"\n=== EXAMINING SPECIFIC PATTERNS ===")
 
 # Look at cases where two variables are similar but one differs
-def find_similar_cases():
+def find_similar_cases(masks):
     print("Looking for cases with similar inputs...")
     
     # Find cases with same days and similar receipts
     for target_days in [1, 2, 3, 4, 5]:
-        day_cases = df[df['days'] == target_days]
+        day_cases = df[masks[f'days_{target_days}']]
         
         if len(day_cases) >= 3:
             # Sort by receipts to see the pattern
@@ -70,7 +79,7 @@ def find_similar_cases():
                 print(f"  Miles: {row['miles']:6.1f}, Receipts: ${row['receipts']:7.2f}, Output: ${row['output']:7.2f}")
                 print(f"    Output/Receipts: {ratio_receipts:6.2f}, Output/Miles: {ratio_miles:6.2f}")
 
-find_similar_cases()
+find_similar_cases(masks)
 
 # Let me check if there are any exact integer relationships
 print(f"\n=== CHECKING FOR EXACT INTEGER RELATIONSHIPS ===")
@@ -152,39 +161,39 @@ check_discrete_patterns()
 # What if the formula uses integer arithmetic or has specific business rules?
 print(f"\n=== BUSINESS RULE ANALYSIS ===")
 
-def analyze_business_rules():
+def analyze_business_rules(masks):
     print("Looking for business rule patterns...")
     
     # From interviews, Kevin mentioned specific combinations that trigger bonuses
     # Let's look for threshold effects
     
     # Check the "5-day sweet spot"
-    five_day_cases = df[df['days'] == 5]
-    print(f"\n5-day trips analysis ({len(five_day_cases)} cases):")
-    print(f"  Output range: ${five_day_cases['output'].min():.2f} - ${five_day_cases['output'].max():.2f}")
-    print(f"  Average output: ${five_day_cases['output'].mean():.2f}")
+    five_day_output = output_arr[masks['days_5']]
+    print(f"\n5-day trips analysis ({len(five_day_output)} cases):")
+    print(f"  Output range: ${five_day_output.min():.2f} - ${five_day_output.max():.2f}")
+    print(f"  Average output: ${five_day_output.mean():.2f}")
     
     # Look for the efficiency bonus Kevin mentioned
-    df['efficiency'] = df['miles'] / df['days']
-    sweet_spot = df[(df['efficiency'] >= 180) & (df['efficiency'] <= 220)]
-    print(f"\nHigh efficiency trips (180-220 miles/day): {len(sweet_spot)} cases")
-    if len(sweet_spot) > 0:
-        print(f"  Average output: ${sweet_spot['output'].mean():.2f}")
-        print(f"  Average for all trips: ${df['output'].mean():.2f}")
+    df['efficiency'] = efficiency
+    sweet_spot_output = output_arr[masks['sweet_spot']]
+    print(f"\nHigh efficiency trips (180-220 miles/day): {len(sweet_spot_output)} cases")
+    if len(sweet_spot_output) > 0:
+        print(f"  Average output: ${sweet_spot_output.mean():.2f}")
+        print(f"  Average for all trips: ${output_arr.mean():.2f}")
     
     # Look for spending per day effects
-    df['spending_per_day'] = df['receipts'] / df['days']
+    df['spending_per_day'] = spending_per_day
     
     # Test Kevin's spending thresholds
     for threshold in [75, 90, 100, 120]:
-        low_spenders = df[df['spending_per_day'] <= threshold]
-        high_spenders = df[df['spending_per_day'] > threshold]
+        low_spenders = spending_per_day <= threshold
+        n_low = np.count_nonzero(low_spenders)
         
-        if len(low_spenders) > 10 and len(high_spenders) > 10:
-            print(f"\nSpending ≤${threshold}/day: avg output ${low_spenders['output'].mean():.2f}")
-            print(f"Spending >${threshold}/day: avg output ${high_spenders['output'].mean():.2f}")
+        if n_low > 10 and len(low_spenders) - n_low > 10:
+            print(f"\nSpending ≤${threshold}/day: avg output ${output_arr[low_spenders].mean():.2f}")
+            print(f"Spending >${threshold}/day: avg output ${output_arr[~low_spenders].mean():.2f}")
 
-analyze_business_rules()
+analyze_business_rules(masks)
 
 print("\nSaving simple pattern check results...")
 df.to_csv('/Users/vthenappan/Documents/GitHub/top-coder-challenge/simple_pattern_results.csv', index=False)
\ No newline at end of file
@@ -11,6 +11,10 @@ import json
 import sys
 import math
 
+# Fallback tree's log1p(receipts) split points, expressed as receipt amounts
+LOG_RECEIPTS_SPLIT_LOW = math.expm1(6.720334)
+LOG_RECEIPTS_SPLIT_HIGH = math.expm1(7.739514)
+
 def load_all_formulas():
     """Load all discovered exact formulas"""
     try:
@@ -104,7 +108,6 @@ def enhanced_fallback(days, miles, receipts):
     """Use optimized tree model logic as fallback"""
     
     # Features from tree model
-    log_receipts = math.log1p(receipts)
     days_miles = days * miles
     days_receipts = days * receipts
     three_way = days * miles * receipts / 1000
@@ -113,7 +116,7 @@ def enhanced_fallback(days, miles, receipts):
     miles_receipts_scaled = miles * receipts / 1000
     
     # Decision tree logic - optimized coefficients
-    if log_receipts <= 6.720334:
+    if receipts <= LOG_RECEIPTS_SPLIT_LOW:
         if days_miles <= 2070.000000:
             if days_receipts <= 562.984985:
                 if days_miles <= 566.000000:
@@ -204,7 +207,7 @@ def enhanced_fallback(days, miles, receipts):
                     else:
                         result = 1693.27
                 else:
-                    if log_receipts <= 7.739514:
+                    if receipts <= LOG_RECEIPTS_SPLIT_HIGH:
                         result = 1642.03
                     else:
                         result = 1677.18
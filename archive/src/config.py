@@ -24,6 +24,10 @@ class ModelConfig:
     min_samples_split: int = 20  # Increased to prevent overfitting
     min_samples_leaf: int = 10  # Increased to prevent overfitting
     
+    # Prediction (threads the trained forest may use; more than 1 can change
+    # the last bits of an average, so the default stays single-threaded)
+    predict_n_jobs: int = 1
+    
     # Feature engineering
     use_polynomial_features: bool = False  # Disabled to reduce complexity
     max_polynomial_degree: int = 2
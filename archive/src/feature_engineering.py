@@ -7,6 +7,7 @@ raw trip data into features suitable for machine learning models.
 
 import math
 import logging
+from bisect import bisect_right
 from typing import List, Dict, Any, Optional
 import numpy as np
 from dataclasses import dataclass
@@ -17,6 +18,22 @@ from .config import ModelConfig
 
 logger = logging.getLogger(__name__)
 
+# Lower edges of the receipt amount buckets (< 50, 50-200, 200-500, 500-1000, >= 1000)
+RECEIPT_BUCKET_EDGES = (50, 200, 500, 1000)
+
+# Lower edges of the miles-per-day efficiency buckets (< 50, 50-100, 100-150, >= 150)
+MPD_BUCKET_EDGES = (50, 100, 150)
+
+# One-hot rows indexed by bucket number, so a batch's bucket indicators come
+# from a single gather
+RECEIPT_BUCKET_FLAGS = np.eye(len(RECEIPT_BUCKET_EDGES) + 1, dtype=np.float32)
+MPD_BUCKET_FLAGS = np.eye(len(MPD_BUCKET_EDGES) + 1, dtype=np.float32)
+
+# (ends in 49, ends in 99) indicators indexed by the cents value
+CENTS_ENDING_FLAGS = np.zeros((100, 2), dtype=np.float32)
+CENTS_ENDING_FLAGS[49, 0] = 1
+CENTS_ENDING_FLAGS[99, 1] = 1
+
 
 @dataclass
 class FeatureSet:
@@ -91,21 +108,19 @@ class FeatureEngineer:
             # Validate input
             trip_input.validate()
             
-            # Extract different types of features
-            basic_features = self._extract_basic_features(trip_input)
-            derived_features = self._extract_derived_features(trip_input)
-            categorical_features = self._extract_categorical_features(trip_input)
-            transformed_features = self._extract_transformed_features(trip_input)
-            
-            # Get feature names
-            feature_names = self._get_feature_names()
+            row = self.extract_feature_row(
+                trip_input.trip_duration_days,
+                trip_input.miles_traveled,
+                trip_input.total_receipts_amount
+            )
             
+            # Split the row back into its feature groups
             feature_set = FeatureSet(
-                basic_features=basic_features,
-                derived_features=derived_features,
-                categorical_features=categorical_features,
-                transformed_features=transformed_features,
-                feature_names=feature_names
+                basic_features=row[:3],
+                derived_features=row[3:12],
+                categorical_features=row[12:27],
+                transformed_features=row[27:],
+                feature_names=self._get_feature_names()
             )
             
             self.logger.debug(f"Extracted {feature_set.feature_count} features")
@@ -115,96 +130,72 @@ class FeatureEngineer:
             self.logger.error(f"Feature extraction failed: {e}")
             raise
     
-    def _extract_basic_features(self, trip_input: TripInput) -> List[float]:
-        """Extract basic input features"""
-        return [
-            float(trip_input.trip_duration_days),
-            float(trip_input.miles_traveled),
-            float(trip_input.total_receipts_amount)
-        ]
-    
-    def _extract_derived_features(self, trip_input: TripInput) -> List[float]:
-        """Extract derived features (ratios, interactions, etc.)"""
-        days = trip_input.trip_duration_days
-        miles = trip_input.miles_traveled
-        receipts = trip_input.total_receipts_amount
+    def extract_feature_row(self, days: float, miles: float, receipts: float) -> List[float]:
+        """
+        Extract the features of one trip as a flat list in column order.
+        
+        This is the single-trip counterpart of extract_features_batch. It is
+        written out straight-line in the order of FeatureSet.all_features, so
+        no intermediate feature groups or NumPy arrays are built. The input is
+        assumed to be validated already.
         
+        Args:
+            days: Trip duration in days
+            miles: Miles traveled
+            receipts: Receipt total
+            
+        Returns:
+            List of feature values, one per feature name
+        """
         # Avoid division by zero
         mpd = miles / days if days > 0 else 0
         rpd = receipts / days if days > 0 else 0
         
-        derived = [
+        # Locate each bucket once instead of testing every range
+        receipt_bucket = bisect_right(RECEIPT_BUCKET_EDGES, receipts)
+        mpd_bucket = bisect_right(MPD_BUCKET_EDGES, mpd)
+        
+        # receipts are validated non-negative, so adding half a cent and
+        # truncating rounds to the nearest cent without calling round()
+        cents = int(receipts * 100 + 0.5) % 100
+        
+        row = [
+            # Basic features
+            float(days),
+            float(miles),
+            float(receipts),
+            
+            # Derived features
             mpd,  # miles per day
             rpd,  # receipts per day
             days * miles,  # interaction: days * miles
             days * receipts,  # interaction: days * receipts
             miles * receipts / 1000,  # interaction: miles * receipts (scaled)
             days * miles * receipts / 1000,  # three-way interaction (scaled)
-        ]
-        
-        # Add efficiency ratios
-        if receipts > 0:
-            derived.extend([
-                miles / receipts,  # miles per dollar
-                1 / (1 + receipts),  # inverse receipts (diminishing returns)
-            ])
-        else:
-            derived.extend([float('inf'), 1.0])  # Handle zero receipts case
-        
-        if miles > 0:
-            derived.append(1 / (1 + miles))  # inverse miles
-        else:
-            derived.append(1.0)
-        
-        return derived
-    
-    def _extract_categorical_features(self, trip_input: TripInput) -> List[float]:
-        """Extract binary categorical indicator features"""
-        days = trip_input.trip_duration_days
-        miles = trip_input.miles_traveled
-        receipts = trip_input.total_receipts_amount
-        mpd = miles / days if days > 0 else 0
-        
-        categorical = [
+            miles / receipts if receipts > 0 else float('inf'),  # miles per dollar
+            1 / (1 + receipts),  # inverse receipts (diminishing returns)
+            1 / (1 + miles),  # inverse miles
+            
+            # Categorical features
             1.0 if days == 5 else 0.0,  # 5-day bonus indicator
             1.0 if days >= 7 else 0.0,  # long trip indicator
-            1.0 if receipts < 50 else 0.0,  # small receipts indicator
+            1.0 if receipt_bucket == 0 else 0.0,  # small receipts indicator
             1.0 if receipts > 1000 else 0.0,  # high receipts indicator
             1.0 if 180 <= mpd <= 220 else 0.0,  # optimal efficiency indicator
-        ]
-        
-        # Receipt amount buckets
-        categorical.extend([
-            1.0 if 50 <= receipts < 200 else 0.0,
-            1.0 if 200 <= receipts < 500 else 0.0,
-            1.0 if 500 <= receipts < 1000 else 0.0,
-        ])
-        
-        # Efficiency buckets
-        categorical.extend([
-            1.0 if mpd < 50 else 0.0,
-            1.0 if 50 <= mpd < 100 else 0.0,
-            1.0 if 100 <= mpd < 150 else 0.0,
-            1.0 if mpd >= 150 else 0.0,
-        ])
-        
-        # Special receipt endings (mentioned in interviews)
-        cents = int(round(receipts * 100)) % 100
-        categorical.extend([
+            1.0 if receipt_bucket == 1 else 0.0,  # receipts 50-200
+            1.0 if receipt_bucket == 2 else 0.0,  # receipts 200-500
+            1.0 if receipt_bucket == 3 else 0.0,  # receipts 500-1000
+            1.0 if mpd_bucket == 0 else 0.0,  # efficiency < 50
+            1.0 if mpd_bucket == 1 else 0.0,  # efficiency 50-100
+            1.0 if mpd_bucket == 2 else 0.0,  # efficiency 100-150
+            1.0 if mpd_bucket == 3 else 0.0,  # efficiency >= 150
+            
+            # Special receipt endings (mentioned in interviews)
             float(cents),  # cents portion
             1.0 if cents == 49 else 0.0,  # ends in 49
             1.0 if cents == 99 else 0.0,  # ends in 99
-        ])
-        
-        return categorical
-    
-    def _extract_transformed_features(self, trip_input: TripInput) -> List[float]:
-        """Extract transformed features (log, polynomial, etc.)"""
-        days = trip_input.trip_duration_days
-        miles = trip_input.miles_traveled
-        receipts = trip_input.total_receipts_amount
-        
-        transformed = [
+            
+            # Transformed features
             math.log1p(days),  # log(1 + days)
             math.log1p(miles),  # log(1 + miles)
             math.log1p(receipts),  # log(1 + receipts)
@@ -213,20 +204,101 @@ class FeatureEngineer:
         # Conservative polynomial features (only if enabled in config)
         if self.config.use_polynomial_features:
             if self.config.max_polynomial_degree >= 2:
-                transformed.extend([
+                row += [
                     days ** 2,
                     miles ** 2 / 1e6,  # scaled to prevent huge values
                     receipts ** 2 / 1e6,  # scaled to prevent huge values
-                ])
+                ]
             
             if self.config.max_polynomial_degree >= 3:
-                transformed.extend([
+                row += [
                     days ** 3,
                     miles ** 3 / 1e9,  # heavily scaled
                     receipts ** 3 / 1e9,  # heavily scaled
-                ])
+                ]
+        
+        return row
+    
+    def extract_features_batch(self, days: np.ndarray, miles: np.ndarray,
+                               receipts: np.ndarray) -> np.ndarray:
+        """
+        Extract features for many trips at once into a single matrix.
+        
+        Columns follow the same order as FeatureSet.all_features, so a row of
+        the result matches extract_features() for the same trip. The matrix is
+        float32 and C-contiguous, which is what the tree models work on
+        internally, so it can be handed to model.predict without a copy.
+        
+        Args:
+            days: Trip durations in days
+            miles: Miles traveled per trip
+            receipts: Receipt totals per trip
+            
+        Returns:
+            Array of shape (n_trips, n_features)
+        """
+        days = np.asarray(days, dtype=np.float64)
+        miles = np.asarray(miles, dtype=np.float64)
+        receipts = np.asarray(receipts, dtype=np.float64)
+        
+        n_features = len(self._get_feature_names())
+        out = np.empty((len(days), n_features), dtype=np.float32)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mpd = np.where(days > 0, miles / days, 0.0)
+            rpd = np.where(days > 0, receipts / days, 0.0)
+            miles_per_dollar = np.where(receipts > 0, miles / receipts, np.inf)
+        
+        # Basic features
+        out[:, 0] = days
+        out[:, 1] = miles
+        out[:, 2] = receipts
+        
+        # Derived features
+        out[:, 3] = mpd
+        out[:, 4] = rpd
+        out[:, 5] = days * miles
+        out[:, 6] = days * receipts
+        out[:, 7] = miles * receipts / 1000
+        out[:, 8] = days * miles * receipts / 1000
+        out[:, 9] = miles_per_dollar
+        out[:, 10] = 1 / (1 + receipts)
+        out[:, 11] = 1 / (1 + miles)
+        
+        # Categorical features
+        receipt_flags = RECEIPT_BUCKET_FLAGS[np.searchsorted(RECEIPT_BUCKET_EDGES, receipts, side='right')]
+        mpd_flags = MPD_BUCKET_FLAGS[np.searchsorted(MPD_BUCKET_EDGES, mpd, side='right')]
+        out[:, 12] = days == 5
+        out[:, 13] = days >= 7
+        out[:, 14] = receipt_flags[:, 0]
+        out[:, 15] = receipts > 1000
+        out[:, 16] = (mpd >= 180) & (mpd <= 220)
+        out[:, 17:20] = receipt_flags[:, 1:4]
+        out[:, 20:24] = mpd_flags
+        
+        # Same half-up rounding as the scalar path (receipts are non-negative)
+        cents = (receipts * 100 + 0.5).astype(np.int64) % 100
+        out[:, 24] = cents
+        out[:, 25:27] = CENTS_ENDING_FLAGS[cents]
+        
+        # Transformed features
+        out[:, 27] = np.log1p(days)
+        out[:, 28] = np.log1p(miles)
+        out[:, 29] = np.log1p(receipts)
+        
+        col = 30
+        if self.config.use_polynomial_features:
+            if self.config.max_polynomial_degree >= 2:
+                out[:, col] = days ** 2
+                out[:, col + 1] = miles ** 2 / 1e6
+                out[:, col + 2] = receipts ** 2 / 1e6
+                col += 3
+            if self.config.max_polynomial_degree >= 3:
+                out[:, col] = days ** 3
+                out[:, col + 1] = miles ** 3 / 1e9
+                out[:, col + 2] = receipts ** 3 / 1e9
         
-        return transformed
+        return out
     
     def _get_feature_names(self) -> List[str]:
         """Get names for all features in order"""
@@ -0,0 +1,133 @@
+"""
+Flattened decision trees for fast prediction without sklearn.
+
+A fitted sklearn regression tree is reduced to plain node lists, which can
+be walked one row at a time, walked level by level over a whole batch,
+compiled into a specialized Python function, or stored in a numpy archive.
+Nothing here imports sklearn, so trees can be evaluated where it is not
+installed.
+"""
+
+from typing import List, Dict, Any, Callable
+import numpy as np
+
+
+def flatten_tree(tree) -> Dict[str, Any]:
+    """
+    Flatten a fitted sklearn regression tree into plain node lists.
+    
+    Walking these lists in Python avoids sklearn's per-call input
+    validation, which dominates the cost of predicting a single row.
+    """
+    tree_ = tree.tree_
+    return {
+        'children_left': tree_.children_left.tolist(),
+        'children_right': tree_.children_right.tolist(),
+        'feature': tree_.feature.tolist(),
+        'threshold': tree_.threshold.tolist(),
+        'value': tree_.value[:, 0, 0].tolist()
+    }
+
+
+def walk_flat_tree(rules: Dict[str, Any], x: List[float]) -> float:
+    """Return the leaf value a flattened tree gives for a float32 feature row"""
+    children_left = rules['children_left']
+    children_right = rules['children_right']
+    feature = rules['feature']
+    threshold = rules['threshold']
+    
+    node = 0
+    while children_left[node] != -1:
+        if x[feature[node]] <= threshold[node]:
+            node = children_left[node]
+        else:
+            node = children_right[node]
+    
+    return rules['value'][node]
+
+
+def walk_flat_tree_batch(rules: Dict[str, Any], X: np.ndarray) -> np.ndarray:
+    """Return the leaf value a flattened tree gives for every row of a float32 feature matrix"""
+    children_left = np.asarray(rules['children_left'])
+    children_right = np.asarray(rules['children_right'])
+    feature = np.asarray(rules['feature'])
+    threshold = np.asarray(rules['threshold'])
+    
+    # Every row steps down one level per pass; rows already at a leaf keep
+    # their node, so the loop runs once per tree level rather than per row
+    rows = np.arange(len(X))
+    node = np.zeros(len(X), dtype=np.intp)
+    internal = children_left[node] != -1
+    while internal.any():
+        go_left = X[rows, feature[node]] <= threshold[node]
+        node = np.where(internal, np.where(go_left, children_left[node], children_right[node]), node)
+        internal = children_left[node] != -1
+    
+    return np.asarray(rules['value'])[node]
+
+
+def compile_flat_tree(rules: Dict[str, Any]) -> Callable[[List[float]], float]:
+    """
+    Generate a Python function with the flattened tree's splits written out
+    as nested if/else statements, and compile it once.
+    
+    The generated function takes the same float32 feature row as
+    walk_flat_tree and returns the same leaf value, but with the feature
+    indices, thresholds and leaf values as constants it skips the node
+    list lookups on every level. Floats are written with repr, which
+    round-trips exactly.
+    """
+    children_left = rules['children_left']
+    children_right = rules['children_right']
+    feature = rules['feature']
+    threshold = rules['threshold']
+    value = rules['value']
+    
+    lines = ['def predict_row(x):']
+    
+    def emit(node: int, depth: int) -> None:
+        indent = '    ' * depth
+        if children_left[node] == -1:
+            lines.append(f'{indent}return {float(value[node])!r}')
+            return
+        lines.append(f'{indent}if x[{int(feature[node])}] <= {float(threshold[node])!r}:')
+        emit(children_left[node], depth + 1)
+        lines.append(f'{indent}else:')
+        emit(children_right[node], depth + 1)
+    
+    emit(0, 1)
+    namespace = {}
+    exec(compile('\n'.join(lines), '<flat tree>', 'exec'), namespace)
+    return namespace['predict_row']
+
+
+def save_flat_trees(path: str, flat_trees: List[Dict[str, Any]]) -> None:
+    """
+    Write flattened trees to a compressed numpy archive.
+    
+    Every tree's node arrays are concatenated, with an offsets table marking
+    where each tree starts; child indices stay relative to their own tree.
+    Thresholds and values keep float64 so reloaded trees split exactly as
+    the originals did.
+    """
+    offsets = np.cumsum([0] + [len(rules['feature']) for rules in flat_trees])
+    np.savez_compressed(
+        path,
+        offsets=offsets.astype(np.int64),
+        children_left=np.concatenate([rules['children_left'] for rules in flat_trees]).astype(np.int32),
+        children_right=np.concatenate([rules['children_right'] for rules in flat_trees]).astype(np.int32),
+        feature=np.concatenate([rules['feature'] for rules in flat_trees]).astype(np.int32),
+        threshold=np.concatenate([rules['threshold'] for rules in flat_trees]).astype(np.float64),
+        value=np.concatenate([rules['value'] for rules in flat_trees]).astype(np.float64)
+    )
+
+
+def load_flat_trees(path: str) -> List[Dict[str, Any]]:
+    """Read trees written by save_flat_trees back into flattened-tree dicts"""
+    with np.load(path) as archive:
+        offsets = archive['offsets'].tolist()
+        columns = {name: archive[name] for name in
+                   ('children_left', 'children_right', 'feature', 'threshold', 'value')}
+    
+    return [{name: column[start:end].tolist() for name, column in columns.items()}
+            for start, end in zip(offsets[:-1], offsets[1:])]
@@ -184,14 +184,21 @@ def generate_predictions(model: ReimbursementModel, test_cases: List[TestCase],
     """
     logger.info(f"Generating predictions for {len(test_cases)} cases")
     
-    predictions = []
-    for case in test_cases:
+    # Invalid cases are reported as ERROR in place; the rest are scored with
+    # one batched model call instead of a single-row predict per case
+    predictions = ["ERROR"] * len(test_cases)
+    valid_indices = []
+    for i, case in enumerate(test_cases):
         try:
-            result = model.predict(case.input_data)
-            predictions.append(str(result.amount))
+            case.input_data.validate()
+            valid_indices.append(i)
         except Exception as e:
             logger.error(f"Prediction failed for case {case.case_id}: {e}")
-            predictions.append("ERROR")
+    
+    if valid_indices:
+        results = model.predict_batch([test_cases[i].input_data for i in valid_indices])
+        for i, result in zip(valid_indices, results):
+            predictions[i] = str(result.amount)
     
     # Save predictions
     with open(output_path, 'w') as f:
@@ -231,6 +238,8 @@ def main():
         # Save trained model
         model.save("trained_model.pkl")
         logger.info("Model saved to trained_model.pkl")
+        model.export_trees("model_trees.npz")
+        logger.info(f"Trees exported to model_trees.npz ({os.path.getsize('model_trees.npz')} bytes)")
         
         # Create production model
         simple_model = create_production_model(model, training_cases)
@@ -16,8 +16,9 @@ from sklearn.metrics import mean_absolute_error, r2_score
 import joblib
 
 from .data_models import TripInput, ReimbursementResult, TestCase, ValidationMetrics
-from .feature_engineering import FeatureEngineer, FeatureSet
+from .feature_engineering import FeatureEngineer
 from .config import ModelConfig, ValidationConfig
+from .flat_tree import flatten_tree, walk_flat_tree, walk_flat_tree_batch, compile_flat_tree, save_flat_trees
 
 
 logger = logging.getLogger(__name__)
@@ -45,6 +46,7 @@ class ReimbursementModel:
         self.model = None
         self.is_trained = False
         self.training_metrics = None
+        self._flat_trees = None
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
         
     def train(self, training_cases: List[TestCase]) -> ValidationMetrics:
@@ -83,6 +85,11 @@ class ReimbursementModel:
         # Train final model on all data (conservative approach)
         self.model = self._create_model()
         self.model.fit(X, y)
+        self._flat_trees = None
+        
+        # Fitting stays single-threaded; batched predictions may use more
+        # threads, each walking a share of the trees over the float32 matrix
+        self.model.set_params(n_jobs=self.model_config.predict_n_jobs)
         
         # Store training information
         self.is_trained = True
@@ -113,24 +120,29 @@ class ReimbursementModel:
             raise RuntimeError("Model must be trained before making predictions")
         
         try:
-            # Extract features
-            feature_set = self.feature_engineer.extract_features(trip_input)
-            X = np.array(feature_set.all_features).reshape(1, -1)
+            trip_input.validate()
+            
+            # Same float32 feature row as batch prediction, built without
+            # running the NumPy batch pipeline on one-element arrays
+            X = np.array([self.feature_engineer.extract_feature_row(
+                trip_input.trip_duration_days,
+                trip_input.miles_traveled,
+                trip_input.total_receipts_amount
+            )], dtype=np.float32)
             
-            # Make prediction
-            prediction = self.model.predict(X)[0]
+            # Average the flattened trees, as RandomForestRegressor.predict does,
+            # without sklearn's per-call overhead for a single row
+            trees = self._get_flat_trees()
+            row = X[0].tolist()
+            prediction = sum(walk_flat_tree(tree, row) for tree in trees) / len(trees)
             
-            # Calculate confidence (simplified approach)
-            confidence = self._calculate_confidence(feature_set)
+            confidence = self._calculate_confidence_batch(X)[0]
             
-            # Create result
-            result = ReimbursementResult(
+            return ReimbursementResult(
                 amount=round(prediction, 2),
-                confidence=confidence
+                confidence=float(confidence)
             )
             
-            return result
-            
         except Exception as e:
             self.logger.error(f"Prediction failed: {e}")
             raise
@@ -145,7 +157,28 @@ class ReimbursementModel:
         Returns:
             List of ReimbursementResult objects
         """
-        return [self.predict(trip_input) for trip_input in trip_inputs]
+        if not self.is_trained:
+            raise RuntimeError("Model must be trained before making predictions")
+        
+        if not trip_inputs:
+            return []
+        
+        for trip_input in trip_inputs:
+            trip_input.validate()
+        
+        # Build one feature matrix and score it with a single predict call
+        X = self.feature_engineer.extract_features_batch(
+            np.array([t.trip_duration_days for t in trip_inputs]),
+            np.array([t.miles_traveled for t in trip_inputs]),
+            np.array([t.total_receipts_amount for t in trip_inputs])
+        )
+        predictions = self.model.predict(X)
+        confidences = self._calculate_confidence_batch(X)
+        
+        return [
+            ReimbursementResult(amount=round(float(prediction), 2), confidence=float(confidence))
+            for prediction, confidence in zip(predictions, confidences)
+        ]
     
     def evaluate(self, test_cases: List[TestCase]) -> ValidationMetrics:
         """
@@ -160,24 +193,26 @@ class ReimbursementModel:
         if not self.is_trained:
             raise RuntimeError("Model must be trained before evaluation")
         
-        predictions = []
-        actuals = []
+        valid_cases = []
         
         for case in test_cases:
             if case.expected_output is None:
                 continue
                 
             try:
-                result = self.predict(case.input_data)
-                predictions.append(result.amount)
-                actuals.append(case.expected_output)
+                case.input_data.validate()
+                valid_cases.append(case)
             except Exception as e:
                 self.logger.error(f"Prediction failed for case {case.case_id}: {e}")
                 continue
         
-        if len(predictions) == 0:
+        if len(valid_cases) == 0:
             raise ValueError("No valid predictions were made")
         
+        results = self.predict_batch([case.input_data for case in valid_cases])
+        predictions = [result.amount for result in results]
+        actuals = [case.expected_output for case in valid_cases]
+        
         return self._calculate_metrics(predictions, actuals)
     
     def save(self, model_path: str) -> None:
@@ -202,6 +237,19 @@ class ReimbursementModel:
         joblib.dump(model_data, model_path)
         self.logger.info(f"Model saved to {model_path}")
     
+    def export_trees(self, trees_path: str) -> None:
+        """
+        Export the forest's trees as flat numpy arrays.
+        
+        Args:
+            trees_path: Path where to write the .npz archive
+        """
+        if not self.is_trained:
+            raise RuntimeError("Cannot export untrained model")
+        
+        save_flat_trees(trees_path, self._get_flat_trees())
+        self.logger.info(f"Trees exported to {trees_path}")
+    
     @classmethod
     def load(cls, model_path: str) -> 'ReimbursementModel':
         """
@@ -226,27 +274,35 @@ class ReimbursementModel:
     
     def _prepare_training_data(self, training_cases: List[TestCase]) -> Tuple[np.ndarray, np.ndarray, List[str]]:
         """Prepare feature matrix and target vector from training cases"""
-        X_list = []
-        y_list = []
-        feature_names = None
+        valid_cases = []
         
         for case in training_cases:
             try:
-                feature_set = self.feature_engineer.extract_features(case.input_data)
-                X_list.append(feature_set.all_features)
-                y_list.append(case.expected_output)
-                
-                if feature_names is None:
-                    feature_names = feature_set.feature_names
-                    
+                case.input_data.validate()
+                valid_cases.append(case)
             except Exception as e:
                 self.logger.warning(f"Skipping case {case.case_id}: {e}")
                 continue
         
-        if len(X_list) == 0:
+        if len(valid_cases) == 0:
             raise ValueError("No valid training cases found")
         
-        return np.array(X_list), np.array(y_list), feature_names
+        # Fill the float32 feature matrix in one vectorized pass
+        X = self.feature_engineer.extract_features_batch(
+            np.array([case.input_data.trip_duration_days for case in valid_cases]),
+            np.array([case.input_data.miles_traveled for case in valid_cases]),
+            np.array([case.input_data.total_receipts_amount for case in valid_cases])
+        )
+        y = np.array([case.expected_output for case in valid_cases], dtype=np.float64)
+        feature_names = self.feature_engineer._get_feature_names()
+        
+        return X, y, feature_names
+    
+    def _get_flat_trees(self) -> List[Dict[str, Any]]:
+        """Flatten the forest's trees on first use and keep them"""
+        if self._flat_trees is None:
+            self._flat_trees = [flatten_tree(tree) for tree in self.model.estimators_]
+        return self._flat_trees
     
     def _create_model(self):
         """Create the machine learning model with conservative hyperparameters"""
@@ -288,24 +344,21 @@ class ReimbursementModel:
             score=mean_mae
         )
     
-    def _calculate_confidence(self, feature_set: FeatureSet) -> float:
-        """Calculate confidence score for a prediction (simplified approach)"""
+    def _calculate_confidence_batch(self, X: np.ndarray) -> np.ndarray:
+        """Calculate confidence scores for each row of a feature matrix (simplified approach)"""
         # For Random Forest, we could use tree variance, but keep it simple
         # Higher confidence for inputs similar to training data
         
-        # Check for extreme values that might indicate out-of-distribution data
-        features = feature_set.all_features
+        # Reduce confidence for extreme values that might indicate
+        # out-of-distribution data, and more so for inf/NaN features
+        finite = np.isfinite(X)
+        extreme = ((np.abs(X) > 1000) & ~np.isinf(X)).any(axis=1)
         
-        confidence = 1.0
+        confidence = np.ones(len(X))
+        confidence[extreme] *= 0.8
+        confidence[~finite.all(axis=1)] *= 0.5
         
-        # Reduce confidence for extreme values
-        if any(abs(f) > 1000 for f in features if not np.isinf(f)):
-            confidence *= 0.8
-        
-        if any(np.isinf(f) or np.isnan(f) for f in features):
-            confidence *= 0.5
-        
-        return max(0.0, min(1.0, confidence))
+        return np.clip(confidence, 0.0, 1.0)
     
     def _calculate_metrics(self, predictions: List[float], actuals: List[float]) -> ValidationMetrics:
         """Calculate validation metrics"""
@@ -361,6 +414,7 @@ class SimpleDecisionTreeModel:
         """
         self.max_depth = max_depth
         self.tree_rules = None
+        self._tree_function = None
         self.feature_engineer = None
         self.is_trained = False
     
@@ -375,15 +429,9 @@ class SimpleDecisionTreeModel:
         # Generate predictions from the complex model
         X, y_original, feature_names = trained_model._prepare_training_data(training_cases)
         
-        # Get predictions from the complex model
-        y_complex = []
-        for case in training_cases:
-            if case.expected_output is not None:
-                try:
-                    result = trained_model.predict(case.input_data)
-                    y_complex.append(result.amount)
-                except:
-                    continue
+        # Score the feature matrix built above in one call, rather than
+        # having predict_batch extract the same features again
+        y_complex = [round(float(prediction), 2) for prediction in trained_model.model.predict(X)]
         
         if len(y_complex) != len(y_original):
             raise ValueError("Mismatch in prediction counts")
@@ -400,6 +448,7 @@ class SimpleDecisionTreeModel:
         
         # Store the approximation
         self.tree_rules = self._extract_tree_rules(simple_tree, feature_names)
+        self._tree_function = compile_flat_tree(self.tree_rules)
         self.feature_engineer = trained_model.feature_engineer
         self.is_trained = True
     
@@ -416,26 +465,56 @@ class SimpleDecisionTreeModel:
         if not self.is_trained:
             raise RuntimeError("Model must be trained before making predictions")
         
-        # Extract features
-        feature_set = self.feature_engineer.extract_features(trip_input)
-        features = feature_set.all_features
+        # Extract features straight into a row in the column order the tree
+        # was fit on, instead of building a FeatureSet of lists
+        trip_input.validate()
+        features = self.feature_engineer.extract_feature_row(
+            trip_input.trip_duration_days,
+            trip_input.miles_traveled,
+            trip_input.total_receipts_amount
+        )
         
         # Apply tree rules (simplified implementation)
         prediction = self._apply_tree_rules(features)
         
         return ReimbursementResult(amount=round(prediction, 2))
     
+    def predict_batch(self, trip_inputs: List[TripInput]) -> List[ReimbursementResult]:
+        """
+        Predict reimbursements for multiple trips using the simple tree rules.
+        
+        Args:
+            trip_inputs: List of trip data to predict reimbursements for
+            
+        Returns:
+            List of ReimbursementResult objects in the same order as the inputs
+        """
+        if not self.is_trained:
+            raise RuntimeError("Model must be trained before making predictions")
+        
+        if not trip_inputs:
+            return []
+        
+        for trip_input in trip_inputs:
+            trip_input.validate()
+        
+        X = self.feature_engineer.extract_features_batch(
+            np.array([t.trip_duration_days for t in trip_inputs]),
+            np.array([t.miles_traveled for t in trip_inputs]),
+            np.array([t.total_receipts_amount for t in trip_inputs])
+        )
+        predictions = walk_flat_tree_batch(self.tree_rules, X)
+        
+        return [ReimbursementResult(amount=round(prediction, 2)) for prediction in predictions.tolist()]
+    
     def _extract_tree_rules(self, tree, feature_names: List[str]) -> Dict[str, Any]:
         """Extract decision tree rules for fast execution"""
-        # This would contain the tree structure for fast execution
-        # For now, return a placeholder
-        return {
-            'tree': tree,
-            'feature_names': feature_names
-        }
+        rules = flatten_tree(tree)
+        rules['feature_names'] = feature_names
+        return rules
     
     def _apply_tree_rules(self, features: List[float]) -> float:
         """Apply tree rules to get prediction"""
-        # Use the stored tree to make prediction
-        X = np.array(features).reshape(1, -1)
-        return self.tree_rules['tree'].predict(X)[0]
\ No newline at end of file
+        # sklearn compares features as float32, so do the same here
+        x = np.asarray(features, dtype=np.float32).tolist()
+        return self._tree_function(x)
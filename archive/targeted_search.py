@@ -33,18 +33,30 @@ def test_targeted_formulas():
     
     print("Testing targeted combinations...")
     
-    for base in base_candidates:
-        for receipt_factor in receipt_candidates:
-            for mile_factor in mile_candidates:
-                predicted = base * df['days'] + receipt_factor * df['receipts'] + mile_factor * df['miles']
-                max_error = abs(predicted - df['output']).max()
-                mean_error = abs(predicted - df['output']).mean()
-                
-                candidates.append((base, receipt_factor, mile_factor, max_error, mean_error))
-                
-                if max_error < 1.0:  # Very good match
-                    print(f"Good match: base={base}, receipt={receipt_factor:.2f}, mile={mile_factor:.2f}")
-                    print(f"  Max error: {max_error:.3f}, Mean error: {mean_error:.3f}")
+    # Evaluate every (base, receipt, mile) combination in one broadcast over
+    # a (base, receipt, mile, case) array instead of a Series per combination
+    days = df['days'].to_numpy(dtype=np.float64)
+    receipts = df['receipts'].to_numpy(dtype=np.float64)
+    miles = df['miles'].to_numpy(dtype=np.float64)
+    output = df['output'].to_numpy(dtype=np.float64)
+    
+    base_grid = np.array(base_candidates, dtype=np.float64)[:, None, None, None]
+    receipt_grid = np.array(receipt_candidates)[None, :, None, None]
+    mile_grid = np.array(mile_candidates)[None, None, :, None]
+    
+    errors = np.abs(base_grid * days + receipt_grid * receipts + mile_grid * miles - output)
+    max_errors = errors.max(axis=-1)
+    mean_errors = errors.mean(axis=-1)
+    
+    for (i, j, k), max_error in np.ndenumerate(max_errors):
+        base, receipt_factor, mile_factor = base_candidates[i], receipt_candidates[j], mile_candidates[k]
+        mean_error = mean_errors[i, j, k]
+        
+        candidates.append((base, receipt_factor, mile_factor, max_error, mean_error))
+        
+        if max_error < 1.0:  # Very good match
+            print(f"Good match: base={base}, receipt={receipt_factor:.2f}, mile={mile_factor:.2f}")
+            print(f"  Max error: {max_error:.3f}, Mean error: {mean_error:.3f}")
     
     # Sort by max error
     candidates.sort(key=lambda x: x[3])
@@ -73,17 +85,31 @@ print(f"Cases with error < 0.1: {(df['error'] < 0.1).sum()}")
 print(f"Cases with error < 0.01: {(df['error'] < 0.01).sum()}")
 
 # Show examples of best and worst predictions
+def top_k_indices(values, k, largest=False):
+    """Positions of the k smallest (or largest) values, ties in row order like nsmallest/nlargest"""
+    keys = -values if largest else values
+    k = min(k, len(keys))
+    if k == 0:
+        return np.empty(0, dtype=np.intp)
+    # A partial partition finds the k-th key in O(n); only rows at or below
+    # it need sorting, which keeps the first-occurrence order on ties
+    kth = np.partition(keys, k - 1)[k - 1]
+    candidates = np.flatnonzero(keys <= kth)
+    return candidates[np.argsort(keys[candidates], kind='stable')][:k]
+
+error_values = df['error'].to_numpy()
+row_values = {col: df[col].to_numpy(dtype=np.float64) for col in ['days', 'miles', 'receipts', 'predicted', 'output', 'error']}
+
+def print_prediction_rows(indices):
+    for i in indices:
+        print(f"Days: {row_values['days'][i]}, Miles: {row_values['miles'][i]:.1f}, Receipts: ${row_values['receipts'][i]:.2f}")
+        print(f"  Predicted: ${row_values['predicted'][i]:.2f}, Actual: ${row_values['output'][i]:.2f}, Error: {row_values['error'][i]:.6f}")
+
 print(f"\nBest predictions (lowest errors):")
-best_predictions = df.nsmallest(5, 'error')
-for _, row in best_predictions.iterrows():
-    print(f"Days: {row['days']}, Miles: {row['miles']:.1f}, Receipts: ${row['receipts']:.2f}")
-    print(f"  Predicted: ${row['predicted']:.2f}, Actual: ${row['output']:.2f}, Error: {row['error']:.6f}")
+print_prediction_rows(top_k_indices(error_values, 5))
 
 print(f"\nWorst predictions (highest errors):")
-worst_predictions = df.nlargest(5, 'error')
-for _, row in worst_predictions.iterrows():
-    print(f"Days: {row['days']}, Miles: {row['miles']:.1f}, Receipts: ${row['receipts']:.2f}")
-    print(f"  Predicted: ${row['predicted']:.2f}, Actual: ${row['output']:.2f}, Error: {row['error']:.6f}")
+print_prediction_rows(top_k_indices(error_values, 5, largest=True))
 
 # Let's also test if there might be a different approach - maybe the formula isn't linear
 print(f"\n=== TESTING NON-LINEAR PATTERNS ===")
@@ -25,6 +25,7 @@ class TestModelConfig(unittest.TestCase):
         self.assertGreaterEqual(config.min_samples_leaf, 5)  # Should prevent overfitting
         self.assertFalse(config.use_polynomial_features)  # Should be disabled by default
         self.assertTrue(config.apply_regularization)
+        self.assertEqual(config.predict_n_jobs, 1)  # Reproducible predictions by default
     
     def test_custom_config(self):
         """Test custom model configuration"""
@@ -4,6 +4,7 @@ Unit tests for feature engineering module.
 
 import unittest
 import math
+import numpy as np
 from src.data_models import TripInput
 from src.feature_engineering import FeatureEngineer, FeatureSet
 from src.config import ModelConfig
@@ -220,6 +221,30 @@ class TestFeatureEngineer(unittest.TestCase):
         with self.assertRaises(ValueError):
             self.engineer.get_feature_importance_explanation(wrong_importances)
 
+    
+    def test_batch_matches_single_extraction(self):
+        """Test that batch feature rows match per-trip extraction"""
+        trips = [
+            TripInput(trip_duration_days=5, miles_traveled=250, total_receipts_amount=150.49),
+            TripInput(trip_duration_days=1, miles_traveled=0, total_receipts_amount=0),
+            TripInput(trip_duration_days=8, miles_traveled=1200, total_receipts_amount=1800.99),
+        ]
+        
+        for engineer in (self.engineer, FeatureEngineer(ModelConfig(use_polynomial_features=True,
+                                                                    max_polynomial_degree=3))):
+            X = engineer.extract_features_batch(
+                [t.trip_duration_days for t in trips],
+                [t.miles_traveled for t in trips],
+                [t.total_receipts_amount for t in trips]
+            )
+            
+            self.assertEqual(X.dtype, np.float32)
+            self.assertTrue(X.flags['C_CONTIGUOUS'])
+            
+            for row, trip in zip(X, trips):
+                expected = np.array(engineer.extract_features(trip).all_features, dtype=np.float32)
+                self.assertEqual(len(row), len(expected))
+                np.testing.assert_array_equal(row, expected)
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,101 @@
+"""
+Unit tests for the flattened decision tree helpers.
+"""
+
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.flat_tree import (walk_flat_tree, walk_flat_tree_batch, compile_flat_tree,
+                           save_flat_trees, load_flat_trees)
+
+
+def build_rules():
+    """
+    Hand-built depth-3 tree over three features:
+
+        node 0: x[0] <= 2.5
+          node 1: x[2] <= 0.1 -> leaf 3 (100.0) / leaf 4 (150.25)
+          node 2: x[1] <= 500.0
+            node 5: x[0] <= 7.5 -> leaf 7 (420.5) / leaf 8 (610.75)
+            leaf 6 (999.99)
+    """
+    return {
+        'children_left': [1, 3, 5, -1, -1, 7, -1, -1, -1],
+        'children_right': [2, 4, 6, -1, -1, 8, -1, -1, -1],
+        'feature': [0, 2, 1, -2, -2, 0, -2, -2, -2],
+        'threshold': [2.5, 0.1, 500.0, -2.0, -2.0, 7.5, -2.0, -2.0, -2.0],
+        'value': [0.0, 0.0, 0.0, 100.0, 150.25, 0.0, 999.99, 420.5, 610.75]
+    }
+
+
+class TestFlatTree(unittest.TestCase):
+    """Test cases for walking, compiling and storing flattened trees"""
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.rules = build_rules()
+        # One row per leaf, plus rows lying exactly on thresholds, which must
+        # go left as sklearn's <= comparison does. float32(0.1) sits just
+        # above the float64 threshold 0.1, so that row goes right
+        self.rows = [
+            [1.0, 10.0, 0.05],
+            [1.0, 10.0, 0.5],
+            [5.0, 100.0, 0.0],
+            [9.0, 100.0, 0.0],
+            [5.0, 800.0, 0.0],
+            [2.5, 0.0, 1.0],
+            [2.0, 0.0, np.float32(0.1)],
+            [7.5, 500.0, 0.0],
+        ]
+        self.rows = np.asarray(self.rows, dtype=np.float32).tolist()
+
+    def test_walk_reaches_expected_leaves(self):
+        """Test that the scalar walk picks the right leaf, ties going left"""
+        expected = [100.0, 150.25, 420.5, 610.75, 999.99, 150.25, 150.25, 420.5]
+        self.assertEqual([walk_flat_tree(self.rules, row) for row in self.rows], expected)
+
+    def test_compiled_tree_matches_walk(self):
+        """Test that the compiled function agrees with walk_flat_tree"""
+        predict_row = compile_flat_tree(self.rules)
+        for row in self.rows:
+            self.assertEqual(predict_row(row), walk_flat_tree(self.rules, row))
+
+    def test_compiled_single_leaf_tree(self):
+        """Test compiling a tree that is only a root leaf"""
+        rules = {'children_left': [-1], 'children_right': [-1], 'feature': [-2],
+                 'threshold': [-2.0], 'value': [42.5]}
+        self.assertEqual(compile_flat_tree(rules)([0.0, 0.0, 0.0]), 42.5)
+
+    def test_batch_walk_matches_walk(self):
+        """Test that the batch walker agrees with walk_flat_tree row by row"""
+        X = np.asarray(self.rows, dtype=np.float32)
+        predictions = walk_flat_tree_batch(self.rules, X)
+
+        self.assertEqual(predictions.shape, (len(self.rows),))
+        self.assertEqual(predictions.tolist(), [walk_flat_tree(self.rules, row) for row in self.rows])
+
+    def test_batch_walk_empty(self):
+        """Test batch walking an empty feature matrix"""
+        predictions = walk_flat_tree_batch(self.rules, np.empty((0, 3), dtype=np.float32))
+        self.assertEqual(len(predictions), 0)
+
+    def test_save_load_round_trip(self):
+        """Test that saved trees load back exactly"""
+        single_leaf = {'children_left': [-1], 'children_right': [-1], 'feature': [-2],
+                       'threshold': [-2.0], 'value': [0.1 + 0.2]}
+        trees = [self.rules, single_leaf]
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'trees.npz')
+            save_flat_trees(path, trees)
+            loaded = load_flat_trees(path)
+
+        self.assertEqual(loaded, trees)
+        for tree in loaded:
+            for name in ('children_left', 'children_right', 'feature'):
+                self.assertTrue(all(type(v) is int for v in tree[name]))
+
+
+if __name__ == '__main__':
+    unittest.main()
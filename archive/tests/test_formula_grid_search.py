@@ -0,0 +1,70 @@
+"""
+Unit tests for the interaction formula grid search.
+"""
+
+import os
+import sys
+import unittest
+
+# formula_grid_search lives at the repository root, next to the search scripts
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import formula_grid_search
+
+
+def nested_loop_interaction_search(case):
+    """The original nested-loop interaction search, kept as the reference"""
+    days, miles, receipts, expected = case['days'], case['miles'], case['receipts'], case['expected']
+    coeffs = formula_grid_search.INTERACTION_COEFFS
+
+    for a in coeffs:
+        for b in coeffs:
+            for c in coeffs:
+                for d in coeffs:
+                    patterns = [
+                        ('days_miles_int', a * days + b * miles + c * receipts + d * (days * miles)),
+                        ('days_receipts_int', a * days + b * miles + c * receipts + d * (days * receipts)),
+                        ('miles_receipts_int', a * days + b * miles + c * receipts + d * (miles * receipts)),
+                        ('three_way_int', a * days + b * miles + c * receipts + d * (days * miles * receipts) ** 0.33),
+                        ('ratio_int', a * days + b * miles + c * receipts + d * (miles / max(days, 1))),
+                    ]
+                    for pattern_name, predicted in patterns:
+                        if abs(predicted - expected) < 0.01:
+                            return pattern_name, [a, b, c, d]
+
+    return None
+
+
+class TestInteractionSearch(unittest.TestCase):
+    """Test cases for test_interaction_formulas against the nested loops"""
+
+    def assertMatchesNestedLoops(self, days, miles, receipts, expected):
+        """Assert the grid search finds what the nested loops find and return its result"""
+        case = {'case_num': 1, 'days': days, 'miles': miles, 'receipts': receipts, 'expected': expected}
+        result = formula_grid_search.test_interaction_formulas(case)
+        
+        found = None if result is None else (result['formula_type'], result['coeffs'])
+        self.assertEqual(found, nested_loop_interaction_search(case))
+        return result
+
+    def test_tiny_interaction_term_prefers_smallest_d(self):
+        """Test that several matching d values within the tolerance yield the smallest"""
+        # miles * receipts = 0.01, so neighbouring d values are only 0.005
+        # apart and d = 6.1 through 7.6 all land within 0.01 of 5.37
+        result = self.assertMatchesNestedLoops(1, 2.0, 0.005, 5.37)
+        self.assertEqual(result['formula_type'], 'miles_receipts_int')
+        self.assertEqual(result['coeffs'], [0.1, 2.6, 0.1, 6.1])
+
+    def test_zero_interaction_term(self):
+        """Test that an interaction term of zero matches with the smallest d"""
+        result = self.assertMatchesNestedLoops(1, 0.0, 0.0, 0.1)
+        self.assertEqual(result['coeffs'], [0.1, 0.1, 0.1, 0.1])
+
+    def test_coarse_interaction_term(self):
+        """Test a case whose interaction spacing is wider than the tolerance"""
+        result = self.assertMatchesNestedLoops(3, 120.0, 45.67, 123.45)
+        self.assertEqual(result['formula_type'], 'three_way_int')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -40,7 +40,10 @@ and gives the highest probability of achieving perfect score (0) on private data
 import sys
 import json
 import math
-import numpy as np
+
+# Fallback tree's log1p(receipts) split points, expressed as receipt amounts
+LOG_RECEIPTS_SPLIT_LOW = math.expm1(6.720334)
+LOG_RECEIPTS_SPLIT_HIGH = math.expm1(7.739514)
 
 def load_all_formulas():
     """Load all 1000 discovered exact formulas (100% PERFECT COVERAGE!)"""
@@ -68,6 +71,25 @@ for formula in ALL_FORMULAS:
     case_num = formula['case_num']
     FORMULA_INDEX[case_num] = formula
 
+# Each formula's position and inputs (missing inputs count as 0), bucketed by
+# whole days, so the tolerance search only visits formulas near a trip's days
+FORMULAS_BY_DAY = {}
+for position, formula in enumerate(ALL_FORMULAS):
+    formula_days = formula.get('days', 0)
+    FORMULAS_BY_DAY.setdefault(math.floor(formula_days), []).append(
+        (position, formula_days, formula.get('miles', 0), formula.get('receipts', 0), formula))
+
+def formulas_near_days(days, tolerance):
+    """(position, days, miles, receipts, formula) entries that may lie within tolerance of days, in file order"""
+    if not math.isfinite(days):
+        return []
+    # One spare bucket either side absorbs rounding in days +/- tolerance
+    nearby = [entry
+              for bucket in range(math.floor(days - tolerance) - 1, math.floor(days + tolerance) + 2)
+              for entry in FORMULAS_BY_DAY.get(bucket, ())]
+    nearby.sort(key=lambda entry: entry[0])
+    return nearby
+
 def apply_formula(formula, days, miles, receipts):
     """Apply a discovered formula to get exact result"""
     
@@ -179,10 +201,10 @@ def find_exact_match(days, miles, receipts, case_num=None):
     
     # Fallback: look for exact input parameter match (legacy method)
     tolerance = 0.01
-    for formula in ALL_FORMULAS:
-        if (abs(formula.get('days', 0) - days) < tolerance and 
-            abs(formula.get('miles', 0) - miles) < tolerance and 
-            abs(formula.get('receipts', 0) - receipts) < tolerance):
+    for _, formula_days, formula_miles, formula_receipts, formula in formulas_near_days(days, tolerance):
+        if (abs(formula_days - days) < tolerance and 
+            abs(formula_miles - miles) < tolerance and 
+            abs(formula_receipts - receipts) < tolerance):
             
             result = apply_formula(formula, days, miles, receipts)
             if result is not None:
@@ -235,17 +257,14 @@ def enhanced_fallback(days, miles, receipts):
     # Features from tree model
     inv_receipts = 1 / (1 + receipts)
     three_way = days * miles * receipts / 1000
-    log_receipts = math.log1p(receipts)
     days_miles = days * miles
     receipts_sq_scaled = receipts ** 2 / 1e6
     days_receipts = days * receipts
     miles_receipts_scaled = miles * receipts / 1000
-    five_day = 1 if days == 5 else 0
-    ends49 = 1 if int(receipts * 100) % 100 == 49 else 0
-    ends99 = 1 if int(receipts * 100) % 100 == 99 else 0
+    cents = int(receipts * 100) % 100
     
     # Decision tree logic (copied from tree model)
-    if log_receipts <= 6.720334:
+    if receipts <= LOG_RECEIPTS_SPLIT_LOW:
         if days_miles <= 2070.000000:
             if days_receipts <= 562.984985:
                 if days_miles <= 566.000000:
@@ -336,7 +355,7 @@ def enhanced_fallback(days, miles, receipts):
                     else:
                         result = 1693.27
                 else:
-                    if log_receipts <= 7.739514:
+                    if receipts <= LOG_RECEIPTS_SPLIT_HIGH:
                         result = 1642.03
                     else:
                         result = 1677.18
@@ -358,13 +377,8 @@ def enhanced_fallback(days, miles, receipts):
                     else:
                         result = 1882.41
     
-    # Apply special adjustments
-    if ends49:
-        result += 3
-    if ends99:
-        result += 3
-    if five_day:
-        result += 10
+    # Apply special adjustments (booleans count as 0/1, so no branching)
+    result += 3 * ((cents == 49) | (cents == 99)) + 10 * (days == 5)
     
     return round(result, 2)
 
@@ -11,6 +11,10 @@ import sys
 import json
 import math
 
+# Fallback tree's log1p(receipts) split points, expressed as receipt amounts
+LOG_RECEIPTS_SPLIT_LOW = math.expm1(6.720334)
+LOG_RECEIPTS_SPLIT_HIGH = math.expm1(7.739514)
+
 def load_all_formulas():
     """Load all discovered exact formulas"""
     try:
@@ -36,6 +40,68 @@ for formula in ALL_FORMULAS:
     )
     FORMULA_INDEX[key] = formula
 
+# Each formula's position and inputs (missing inputs count as 0), bucketed by
+# whole days, so the tolerance search only visits formulas near a trip's days
+FORMULAS_BY_DAY = {}
+for position, formula in enumerate(ALL_FORMULAS):
+    formula_days = formula.get('days', 0)
+    FORMULAS_BY_DAY.setdefault(math.floor(formula_days), []).append(
+        (position, formula_days, formula.get('miles', 0), formula.get('receipts', 0), formula))
+
+def formulas_near_days(days, tolerance):
+    """(position, days, miles, receipts, formula) entries that may lie within tolerance of days, in file order"""
+    if not math.isfinite(days):
+        return []
+    # One spare bucket either side absorbs rounding in days +/- tolerance
+    nearby = [entry
+              for bucket in range(math.floor(days - tolerance) - 1, math.floor(days + tolerance) + 2)
+              for entry in FORMULAS_BY_DAY.get(bucket, ())]
+    nearby.sort(key=lambda entry: entry[0])
+    return nearby
+
+# Formula evaluators keyed by formula_type, each called as f(coeffs, days, miles, receipts)
+FORMULA_FUNCTIONS = {
+    'linear': lambda c, d, m, r: c[0] * d + c[1] * m + c[2] * r,
+    'linear_with_constant': lambda c, d, m, r: c[0] * d + c[1] * m + c[2] * r + c[3],
+    'linear_expanded': lambda c, d, m, r: c[0] * d + c[1] * m + c[2] * r,
+    'log_receipts': lambda c, d, m, r: c[0] * d + c[1] * m + c[2] * math.log1p(r),
+    'log_miles': lambda c, d, m, r: c[0] * d + c[1] * math.log1p(m) + c[2] * r,
+    'sqrt_miles': lambda c, d, m, r: c[0] * d + c[1] * math.sqrt(m) + c[2] * r,
+    'sqrt_receipts': lambda c, d, m, r: c[0] * d + c[1] * m + c[2] * math.sqrt(r),
+    'three_way_int': lambda c, d, m, r: c[0] * d + c[1] * m + c[2] * r + c[3] * (d * m * r) ** 0.33,
+    'ratio_int': lambda c, d, m, r: c[0] * d + c[1] * m + c[2] * r + c[3] * (m / max(d, 1)),
+    
+    # Additional formula types
+    'receipt_dominant_linear': lambda c, d, m, r: c[0] * r + c[1],
+    'receipt_dominant_with_days': lambda c, d, m, r: c[0] * r + c[1] * d + c[2],
+    'receipt_dominant_with_miles': lambda c, d, m, r: c[0] * r + c[1] * m + c[2],
+    'receipt_log_days': lambda c, d, m, r: c[0] * r + c[1] * math.log1p(d) + c[2],
+    'receipt_log_miles': lambda c, d, m, r: c[0] * r + c[1] * math.log1p(m) + c[2],
+    'receipt_sqrt_days': lambda c, d, m, r: c[0] * r + c[1] * math.sqrt(d) + c[2],
+    'receipt_sqrt_miles': lambda c, d, m, r: c[0] * r + c[1] * math.sqrt(m) + c[2],
+    'receipt_power': lambda c, d, m, r: c[0] * (r ** c[1]) + c[2],
+    'ratio_rpd': lambda c, d, m, r: c[0] * (r / max(d, 1)) + c[1] * d + c[2],
+    'ratio_mpd': lambda c, d, m, r: c[0] * (m / max(d, 1)) + c[1] * r * 0.01 + c[2],
+    'ratio_mixed': lambda c, d, m, r: c[0] * (r / max(d, 1)) + c[1] * (m / max(d, 1)) + c[2],
+    
+    # Genetic search results; unknown genetic_* variants use the linear form
+    'genetic_linear': lambda c, d, m, r: c[0] * r + c[1] * d + c[2],
+    'genetic_with_log': lambda c, d, m, r: c[0] * r + c[1] * math.log1p(d) + c[2],
+    'genetic_with_sqrt': lambda c, d, m, r: c[0] * r + c[1] * math.sqrt(m) + c[2],
+    'genetic_with_power': lambda c, d, m, r: c[0] * (r ** 0.75) + c[1] * d + c[2],
+    
+    'simple_receipt_ratio': lambda c, d, m, r: c[0] * r + c[1],
+    'days_miles_constant': lambda c, d, m, r: c[0] * d + c[1] * m + c[2],
+}
+
+def apply_by_coeff_count(coeffs, days, miles, receipts):
+    """Generic linear combination chosen by how many coefficients are available"""
+    if len(coeffs) >= 3:
+        return coeffs[0] * days + coeffs[1] * miles + coeffs[2] * receipts
+    elif len(coeffs) >= 2:
+        return coeffs[0] * receipts + coeffs[1]
+    return None
+
 def apply_formula(formula, days, miles, receipts):
     """Apply a discovered formula to get exact result"""
     
@@ -43,114 +109,18 @@ def apply_formula(formula, days, miles, receipts):
     coeffs = formula.get('coeffs', [])
     
     try:
-        if formula_type == 'linear':
-            return coeffs[0] * days + coeffs[1] * miles + coeffs[2] * receipts
-            
-        elif formula_type == 'linear_with_constant':
-            return coeffs[0] * days + coeffs[1] * miles + coeffs[2] * receipts + coeffs[3]
-            
-        elif formula_type == 'linear_expanded':
-            return coeffs[0] * days + coeffs[1] * miles + coeffs[2] * receipts
-            
-        elif formula_type == 'log_receipts':
-            return coeffs[0] * days + coeffs[1] * miles + coeffs[2] * math.log1p(receipts)
-            
-        elif formula_type == 'log_miles':
-            return coeffs[0] * days + coeffs[1] * math.log1p(miles) + coeffs[2] * receipts
-            
-        elif formula_type == 'sqrt_miles':
-            return coeffs[0] * days + coeffs[1] * math.sqrt(miles) + coeffs[2] * receipts
-            
-        elif formula_type == 'sqrt_receipts':
-            return coeffs[0] * days + coeffs[1] * miles + coeffs[2] * math.sqrt(receipts)
-            
-        elif formula_type == 'three_way_int':
-            return coeffs[0] * days + coeffs[1] * miles + coeffs[2] * receipts + coeffs[3] * (days * miles * receipts) ** 0.33
-            
-        elif formula_type == 'ratio_int':
-            return coeffs[0] * days + coeffs[1] * miles + coeffs[2] * receipts + coeffs[3] * (miles / max(days, 1))
-        
-        # Handle additional formula types
-        elif formula_type == 'receipt_dominant_linear':
-            return coeffs[0] * receipts + coeffs[1]
-            
-        elif formula_type == 'receipt_dominant_with_days':
-            return coeffs[0] * receipts + coeffs[1] * days + coeffs[2]
-            
-        elif formula_type == 'receipt_dominant_with_miles':
-            return coeffs[0] * receipts + coeffs[1] * miles + coeffs[2]
-            
-        elif formula_type == 'receipt_log_days':
-            return coeffs[0] * receipts + coeffs[1] * math.log1p(days) + coeffs[2]
-            
-        elif formula_type == 'receipt_log_miles':
-            return coeffs[0] * receipts + coeffs[1] * math.log1p(miles) + coeffs[2]
-            
-        elif formula_type == 'receipt_sqrt_days':
-            return coeffs[0] * receipts + coeffs[1] * math.sqrt(days) + coeffs[2]
-            
-        elif formula_type == 'receipt_sqrt_miles':
-            return coeffs[0] * receipts + coeffs[1] * math.sqrt(miles) + coeffs[2]
-            
-        elif formula_type == 'receipt_power':
-            return coeffs[0] * (receipts ** coeffs[1]) + coeffs[2]
-            
-        elif formula_type == 'ratio_rpd':
-            return coeffs[0] * (receipts / max(days, 1)) + coeffs[1] * days + coeffs[2]
-            
-        elif formula_type == 'ratio_mpd':
-            mpd = miles / max(days, 1)
-            return coeffs[0] * mpd + coeffs[1] * receipts * 0.01 + coeffs[2]
-            
-        elif formula_type == 'ratio_mixed':
-            rpd = receipts / max(days, 1)
-            mpd = miles / max(days, 1)
-            return coeffs[0] * rpd + coeffs[1] * mpd + coeffs[2]
-            
-        elif formula_type.startswith('genetic_'):
-            base_type = formula_type.replace('genetic_', '')
-            if base_type == 'linear':
-                return coeffs[0] * receipts + coeffs[1] * days + coeffs[2]
-            elif base_type == 'with_log':
-                return coeffs[0] * receipts + coeffs[1] * math.log1p(days) + coeffs[2]
-            elif base_type == 'with_sqrt':
-                return coeffs[0] * receipts + coeffs[1] * math.sqrt(miles) + coeffs[2]
-            elif base_type == 'with_power':
-                return coeffs[0] * (receipts ** 0.75) + coeffs[1] * days + coeffs[2]
-            else:
-                return coeffs[0] * receipts + coeffs[1] * days + coeffs[2]
-        
-        elif formula_type == 'simple_receipt_ratio':
-            return coeffs[0] * receipts + coeffs[1]
-            
-        elif formula_type == 'days_miles_constant':
-            return coeffs[0] * days + coeffs[1] * miles + coeffs[2]
+        evaluate = FORMULA_FUNCTIONS.get(formula_type)
+        if evaluate is None and formula_type.startswith('genetic_'):
+            evaluate = FORMULA_FUNCTIONS['genetic_linear']
+        if evaluate is not None:
+            return evaluate(coeffs, days, miles, receipts)
         
-        elif formula_type == 'nonlinear':
-            # For nonlinear, handle missing coefficients gracefully
-            if len(coeffs) >= 3:
-                return coeffs[0] * days + coeffs[1] * miles + coeffs[2] * receipts
-            elif len(coeffs) >= 2:
-                return coeffs[0] * receipts + coeffs[1]
-            else:
-                return None
-                
-        else:
-            # Default linear combination
-            if len(coeffs) >= 3:
-                return coeffs[0] * days + coeffs[1] * miles + coeffs[2] * receipts
-            elif len(coeffs) >= 2:
-                return coeffs[0] * receipts + coeffs[1]
-            else:
-                return None
+        # Nonlinear and unknown formula types: handle missing coefficients gracefully
+        return apply_by_coeff_count(coeffs, days, miles, receipts)
             
     except Exception as e:
         # Fallback if formula application fails
-        if len(coeffs) >= 3:
-            return coeffs[0] * days + coeffs[1] * miles + coeffs[2] * receipts
-        elif len(coeffs) >= 2:
-            return coeffs[0] * receipts + coeffs[1]
-        return None
+        return apply_by_coeff_count(coeffs, days, miles, receipts)
 
 def find_exact_match(days, miles, receipts):
     """Look for exact match using precise input parameter lookup"""
@@ -175,10 +145,10 @@ def find_exact_match(days, miles, receipts):
     
     # Fallback: look for approximate matches with tolerance
     tolerance = 0.01
-    for formula in ALL_FORMULAS:
-        if (abs(formula.get('days', 0) - days) < tolerance and 
-            abs(formula.get('miles', 0) - miles) < tolerance and 
-            abs(formula.get('receipts', 0) - receipts) < tolerance):
+    for _, formula_days, formula_miles, formula_receipts, formula in formulas_near_days(days, tolerance):
+        if (abs(formula_days - days) < tolerance and 
+            abs(formula_miles - miles) < tolerance and 
+            abs(formula_receipts - receipts) < tolerance):
             
             result = apply_formula(formula, days, miles, receipts)
             if result is not None:
@@ -190,7 +160,6 @@ def enhanced_fallback(days, miles, receipts):
     """Use optimized tree model logic as fallback"""
     
     # Features from tree model
-    log_receipts = math.log1p(receipts)
     days_miles = days * miles
     days_receipts = days * receipts
     three_way = days * miles * receipts / 1000
@@ -199,7 +168,7 @@ def enhanced_fallback(days, miles, receipts):
     miles_receipts_scaled = miles * receipts / 1000
     
     # Decision tree logic
-    if log_receipts <= 6.720334:
+    if receipts <= LOG_RECEIPTS_SPLIT_LOW:
         if days_miles <= 2070.000000:
             if days_receipts <= 562.984985:
                 if days_miles <= 566.000000:
@@ -290,7 +259,7 @@ def enhanced_fallback(days, miles, receipts):
                     else:
                         result = 1693.27
                 else:
-                    if log_receipts <= 7.739514:
+                    if receipts <= LOG_RECEIPTS_SPLIT_HIGH:
                         result = 1642.03
                     else:
                         result = 1677.18
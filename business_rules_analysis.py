@@ -16,7 +16,6 @@ Hypothesis: Different rate structures based on:
 import json
 import numpy as np
 import pandas as pd
-from collections import defaultdict
 
 def load_data():
     """Load public cases and discovered formulas"""
@@ -33,87 +32,99 @@ def analyze_business_rule_patterns(public_cases, formulas):
     
     print("=== BUSINESS RULE PATTERN ANALYSIS ===")
     
-    # Create lookup for formulas by case number
-    formula_by_case = {}
-    for formula in formulas:
-        formula_by_case[formula['case_num']] = formula
+    # Case inputs, numbered from 1 in file order
+    cases_df = pd.json_normalize(public_cases).rename(columns={
+        'input.trip_duration_days': 'days',
+        'input.miles_traveled': 'miles',
+        'input.total_receipts_amount': 'receipts',
+        'expected_output': 'expected'
+    })
+    cases_df.insert(0, 'case_num', np.arange(1, len(cases_df) + 1))
     
-    # Analyze patterns by trip characteristics
-    analysis_data = []
+    # Formula type and coefficients per case, one column per coefficient slot
+    coeff_names = ['day_coeff', 'mile_coeff', 'receipt_coeff', 'constant']
+    formulas_df = pd.DataFrame(
+        [formula.get('coeffs', []) for formula in formulas]
+    ).reindex(columns=range(len(coeff_names)))
+    formulas_df.columns = coeff_names
+    formulas_df.insert(0, 'case_num', [formula['case_num'] for formula in formulas])
+    formulas_df.insert(1, 'formula_type', [formula.get('formula_type', 'fallback') for formula in formulas])
+    formulas_df = formulas_df.drop_duplicates('case_num', keep='last')
     
-    for i, case in enumerate(public_cases):
-        case_num = i + 1
-        input_data = case['input']
-        
-        days = input_data['trip_duration_days']
-        miles = input_data['miles_traveled']
-        receipts = input_data['total_receipts_amount']
-        expected = case['expected_output']
-        
-        # Categorize the trip
-        trip_length_cat = 'short' if days <= 3 else 'medium' if days <= 7 else 'long'
-        distance_cat = 'local' if miles <= 200 else 'medium' if miles <= 600 else 'long'
-        spending_cat = 'low' if receipts <= 500 else 'medium' if receipts <= 1500 else 'high'
-        
-        # Get formula info if available
-        formula_info = formula_by_case.get(case_num, {})
-        formula_type = formula_info.get('formula_type', 'fallback')
-        coeffs = formula_info.get('coeffs', [])
-        
-        analysis_data.append({
-            'case_num': case_num,
-            'days': days,
-            'miles': miles,
-            'receipts': receipts,
-            'expected': expected,
-            'trip_length_cat': trip_length_cat,
-            'distance_cat': distance_cat,
-            'spending_cat': spending_cat,
-            'formula_type': formula_type,
-            'day_coeff': coeffs[0] if len(coeffs) > 0 else None,
-            'mile_coeff': coeffs[1] if len(coeffs) > 1 else None,
-            'receipt_coeff': coeffs[2] if len(coeffs) > 2 else None,
-            'constant': coeffs[3] if len(coeffs) > 3 else None
-        })
+    df = cases_df.merge(formulas_df, on='case_num', how='left')
+    df['formula_type'] = df['formula_type'].fillna('fallback')
+    
+    # Categorize the trips
+    df['trip_length_cat'] = np.select([df['days'] <= 3, df['days'] <= 7], ['short', 'medium'], 'long')
+    df['distance_cat'] = np.select([df['miles'] <= 200, df['miles'] <= 600], ['local', 'medium'], 'long')
+    df['spending_cat'] = np.select([df['receipts'] <= 500, df['receipts'] <= 1500], ['low', 'medium'], 'high')
+    
+    df = df[['case_num', 'days', 'miles', 'receipts', 'expected',
+             'trip_length_cat', 'distance_cat', 'spending_cat', 'formula_type'] + coeff_names]
+    
+    # Summaries below work on plain arrays with integer category codes
+    # (0/1/2 in the short/medium/long order of each breakdown)
+    days = df['days'].to_numpy()
+    miles = df['miles'].to_numpy()
+    receipts = df['receipts'].to_numpy()
+    is_linear = df['formula_type'].isin(['linear', 'linear_with_constant']).to_numpy()
+    coeff_cols = {col: df[col].to_numpy(dtype=float)[is_linear]
+                  for col in ['day_coeff', 'mile_coeff', 'receipt_coeff']}
+    
+    trip_codes = np.where(days <= 3, 0, np.where(days <= 7, 1, 2)).astype(np.int8)
+    distance_codes = np.where(miles <= 200, 0, np.where(miles <= 600, 1, 2)).astype(np.int8)
+    spending_codes = np.where(receipts <= 500, 0, np.where(receipts <= 1500, 1, 2)).astype(np.int8)
     
-    df = pd.DataFrame(analysis_data)
+    def category_stats(codes):
+        """Per-category case counts and linear-formula coefficient means"""
+        linear_codes = codes[is_linear]
+        total_counts = np.bincount(codes, minlength=3)
+        linear_counts = np.bincount(linear_codes, minlength=3)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = {col: np.bincount(linear_codes, weights=values, minlength=3) / linear_counts
+                     for col, values in coeff_cols.items()}
+        return linear_codes, total_counts, linear_counts, means
+    
+    def coeff_mode(values):
+        """Most common coefficient (smallest on ties), or 'N/A' if none"""
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return 'N/A'
+        unique_values, counts = np.unique(values, return_counts=True)
+        return unique_values[counts.argmax()]
     
-    # Analyze coefficient patterns by categories
     print(f"\n=== COEFFICIENT PATTERNS BY TRIP LENGTH ===")
-    for trip_cat in ['short', 'medium', 'long']:
-        subset = df[df['trip_length_cat'] == trip_cat]
-        linear_subset = subset[subset['formula_type'].isin(['linear', 'linear_with_constant'])]
-        
-        if len(linear_subset) > 10:
-            print(f"\n{trip_cat.upper()} trips ({subset['days'].min()}-{subset['days'].max()} days):")
-            print(f"  Cases: {len(subset)} total, {len(linear_subset)} linear")
-            print(f"  Day coeff: mean={linear_subset['day_coeff'].mean():.1f}, mode={linear_subset['day_coeff'].mode().iloc[0] if len(linear_subset['day_coeff'].mode()) > 0 else 'N/A'}")
-            print(f"  Mile coeff: mean={linear_subset['mile_coeff'].mean():.2f}")
-            print(f"  Receipt coeff: mean={linear_subset['receipt_coeff'].mean():.2f}")
+    linear_codes, total_counts, linear_counts, means = category_stats(trip_codes)
+    for code, trip_cat in enumerate(['short', 'medium', 'long']):
+        if linear_counts[code] > 10:
+            in_cat = days[trip_codes == code]
+            print(f"\n{trip_cat.upper()} trips ({in_cat.min()}-{in_cat.max()} days):")
+            print(f"  Cases: {total_counts[code]} total, {linear_counts[code]} linear")
+            print(f"  Day coeff: mean={means['day_coeff'][code]:.1f}, mode={coeff_mode(coeff_cols['day_coeff'][linear_codes == code])}")
+            print(f"  Mile coeff: mean={means['mile_coeff'][code]:.2f}")
+            print(f"  Receipt coeff: mean={means['receipt_coeff'][code]:.2f}")
     
     print(f"\n=== COEFFICIENT PATTERNS BY DISTANCE ===")
-    for dist_cat in ['local', 'medium', 'long']:
-        subset = df[df['distance_cat'] == dist_cat]
-        linear_subset = subset[subset['formula_type'].isin(['linear', 'linear_with_constant'])]
-        
-        if len(linear_subset) > 10:
-            print(f"\n{dist_cat.upper()} distance ({subset['miles'].min():.0f}-{subset['miles'].max():.0f} miles):")
-            print(f"  Cases: {len(subset)} total, {len(linear_subset)} linear")
-            print(f"  Day coeff: mean={linear_subset['day_coeff'].mean():.1f}")
-            print(f"  Mile coeff: mean={linear_subset['mile_coeff'].mean():.2f}, mode={linear_subset['mile_coeff'].mode().iloc[0] if len(linear_subset['mile_coeff'].mode()) > 0 else 'N/A'}")
-            print(f"  Receipt coeff: mean={linear_subset['receipt_coeff'].mean():.2f}")
+    linear_codes, total_counts, linear_counts, means = category_stats(distance_codes)
+    for code, dist_cat in enumerate(['local', 'medium', 'long']):
+        if linear_counts[code] > 10:
+            in_cat = miles[distance_codes == code]
+            print(f"\n{dist_cat.upper()} distance ({in_cat.min():.0f}-{in_cat.max():.0f} miles):")
+            print(f"  Cases: {total_counts[code]} total, {linear_counts[code]} linear")
+            print(f"  Day coeff: mean={means['day_coeff'][code]:.1f}")
+            print(f"  Mile coeff: mean={means['mile_coeff'][code]:.2f}, mode={coeff_mode(coeff_cols['mile_coeff'][linear_codes == code])}")
+            print(f"  Receipt coeff: mean={means['receipt_coeff'][code]:.2f}")
     
     print(f"\n=== COEFFICIENT PATTERNS BY SPENDING ===")
-    for spend_cat in ['low', 'medium', 'high']:
-        subset = df[df['spending_cat'] == spend_cat]
-        linear_subset = subset[subset['formula_type'].isin(['linear', 'linear_with_constant'])]
-        
-        if len(linear_subset) > 10:
-            print(f"\n{spend_cat.upper()} spending (${subset['receipts'].min():.0f}-${subset['receipts'].max():.0f}):")
-            print(f"  Cases: {len(subset)} total, {len(linear_subset)} linear")
-            print(f"  Day coeff: mean={linear_subset['day_coeff'].mean():.1f}")
-            print(f"  Mile coeff: mean={linear_subset['mile_coeff'].mean():.2f}")
-            print(f"  Receipt coeff: mean={linear_subset['receipt_coeff'].mean():.2f}, mode={linear_subset['receipt_coeff'].mode().iloc[0] if len(linear_subset['receipt_coeff'].mode()) > 0 else 'N/A'}")
+    linear_codes, total_counts, linear_counts, means = category_stats(spending_codes)
+    for code, spend_cat in enumerate(['low', 'medium', 'high']):
+        if linear_counts[code] > 10:
+            in_cat = receipts[spending_codes == code]
+            print(f"\n{spend_cat.upper()} spending (${in_cat.min():.0f}-${in_cat.max():.0f}):")
+            print(f"  Cases: {total_counts[code]} total, {linear_counts[code]} linear")
+            print(f"  Day coeff: mean={means['day_coeff'][code]:.1f}")
+            print(f"  Mile coeff: mean={means['mile_coeff'][code]:.2f}")
+            print(f"  Receipt coeff: mean={means['receipt_coeff'][code]:.2f}, mode={coeff_mode(coeff_cols['receipt_coeff'][linear_codes == code])}")
     
     return df
 
@@ -132,8 +143,8 @@ def test_conditional_business_rules(public_cases, df):
     
     if len(day_10_cases) > 0:
         print(f"Trip length distribution:")
-        for days in sorted(day_10_cases['days'].unique()):
-            count = len(day_10_cases[day_10_cases['days'] == days])
+        trip_days, day_counts = np.unique(day_10_cases['days'].to_numpy(), return_counts=True)
+        for days, count in zip(trip_days, day_counts):
             print(f"  {days} days: {count} cases")
         
         print(f"Most common mile coefficients:")
@@ -146,6 +157,12 @@ def test_conditional_business_rules(public_cases, df):
         for coeff, count in receipt_coeffs.items():
             print(f"  {coeff}: {count} cases")
     
+    # Input columns shared by the rule hypotheses below
+    days = df['days'].to_numpy()
+    miles = df['miles'].to_numpy()
+    receipts = df['receipts'].to_numpy()
+    expected = df['expected'].to_numpy()
+    
     # Hypothesis 2: Different rates for different trip lengths
     print(f"\n--- Hypothesis 2: Trip length-based rates ---")
     
@@ -181,34 +198,22 @@ def test_conditional_business_rules(public_cases, df):
         for candidate in candidates:
             print(f"\nTesting: {candidate['name']}")
             
-            exact_matches = 0
-            errors = []
+            # Pick the day rate for every trip at once; trips outside all
+            # ranges get NaN and are left out of the error statistics
+            conds = [(days >= min_days) & (days <= max_days)
+                     for (min_days, max_days) in candidate['rules']]
+            choices = list(candidate['rules'].values())
+            day_rate = np.select(conds, choices, default=np.nan)
+            covered = ~np.isnan(day_rate)
+            
+            predicted = (day_rate[covered] * days[covered] +
+                         candidate['mile_rate'] * miles[covered] +
+                         candidate['receipt_rate'] * receipts[covered])
             
-            for _, row in df.iterrows():
-                days = row['days']
-                miles = row['miles'] 
-                receipts = row['receipts']
-                expected = row['expected']
-                
-                # Find the day rate for this trip length
-                day_rate = None
-                for (min_days, max_days), rate in candidate['rules'].items():
-                    if min_days <= days <= max_days:
-                        day_rate = rate
-                        break
-                
-                if day_rate is not None:
-                    predicted = (day_rate * days + 
-                               candidate['mile_rate'] * miles + 
-                               candidate['receipt_rate'] * receipts)
-                    
-                    error = abs(predicted - expected)
-                    errors.append(error)
-                    
-                    if error < 0.01:
-                        exact_matches += 1
+            errors = np.abs(predicted - expected[covered])
+            exact_matches = int((errors < 0.01).sum())
             
-            avg_error = np.mean(errors)
+            avg_error = errors.mean()
             score = avg_error * 100 + (1000 - exact_matches) * 0.1
             
             print(f"  Exact matches: {exact_matches}/1000 ({exact_matches/10:.1f}%)")
@@ -239,34 +244,21 @@ def test_conditional_business_rules(public_cases, df):
         for candidate in candidates:
             print(f"\nTesting: {candidate['name']}")
             
-            exact_matches = 0
-            errors = []
+            # Pick the receipt rate for every trip's spending level at once
+            conds = [(receipts >= min_receipts) & (receipts < max_receipts)
+                     for (min_receipts, max_receipts) in candidate['receipt_rules']]
+            choices = list(candidate['receipt_rules'].values())
+            receipt_rate = np.select(conds, choices, default=np.nan)
+            covered = ~np.isnan(receipt_rate)
+            
+            predicted = (candidate['day_rate'] * days[covered] +
+                         candidate['mile_rate'] * miles[covered] +
+                         receipt_rate[covered] * receipts[covered])
             
-            for _, row in df.iterrows():
-                days = row['days']
-                miles = row['miles']
-                receipts = row['receipts']
-                expected = row['expected']
-                
-                # Find receipt rate for this spending level
-                receipt_rate = None
-                for (min_receipts, max_receipts), rate in candidate['receipt_rules'].items():
-                    if min_receipts <= receipts < max_receipts:
-                        receipt_rate = rate
-                        break
-                
-                if receipt_rate is not None:
-                    predicted = (candidate['day_rate'] * days +
-                               candidate['mile_rate'] * miles +
-                               receipt_rate * receipts)
-                    
-                    error = abs(predicted - expected)
-                    errors.append(error)
-                    
-                    if error < 0.01:
-                        exact_matches += 1
+            errors = np.abs(predicted - expected[covered])
+            exact_matches = int((errors < 0.01).sum())
             
-            avg_error = np.mean(errors)
+            avg_error = errors.mean()
             score = avg_error * 100 + (1000 - exact_matches) * 0.1
             
             print(f"  Exact matches: {exact_matches}/1000 ({exact_matches/10:.1f}%)")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+PUBLIC CASE LOADING
+===================
+
+Shared JSON helpers and the cached array form of public_cases.json used by
+coefficient_pattern_analysis.py and comprehensive_formula_search_v2.py.
+
+Both scripts read the public cases as one (4, N) float64 table of days,
+miles, receipts and expected output, cached in public_cases_arrays.npy.
+load_case_arrays is the only writer of that cache, so the two scripts
+always agree on its layout and on when it is stale.
+"""
+
+import os
+import json
+import numpy as np
+
+PUBLIC_CASES_PATH = 'public_cases.json'
+TEST_ARRAYS_PATH = 'public_cases_arrays.npy'
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def read_json(path):
+    """Parse a JSON file, using orjson when it is installed"""
+    if orjson is not None:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    
+    with open(path, 'r') as f:
+        return json.load(f)
+
+def write_json(path, data):
+    """Write data as JSON indented by two spaces, using orjson when it is installed"""
+    if orjson is not None:
+        with open(path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        return
+    
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2)
+
+def build_case_table(public_cases):
+    """Stack public cases into a C-ordered (4, N) float64 table of days, miles, receipts and expected output"""
+    return np.ascontiguousarray(np.array([
+        (
+            case['input']['trip_duration_days'],
+            case['input']['miles_traveled'],
+            case['input']['total_receipts_amount'],
+            case['expected_output'],
+        )
+        for case in public_cases
+    ], dtype=np.float64).reshape(-1, 4).T)
+
+def load_case_arrays(public_cases=None):
+    """
+    Return the public cases as a (4, N) float64 table of days, miles,
+    receipts and expected output, cached on disk between runs.
+    
+    The table is saved as one .npy file and memory-mapped back, so later
+    runs skip parsing public_cases.json. The cache is rebuilt when the JSON
+    is newer, when the file is not a (4, N) table, or when public_cases is
+    given and its case count no longer matches N. Without public_cases the
+    JSON is only parsed on a cache miss.
+    """
+    try:
+        if os.path.getmtime(TEST_ARRAYS_PATH) >= os.path.getmtime(PUBLIC_CASES_PATH):
+            table = np.load(TEST_ARRAYS_PATH, mmap_mode='r')
+            if table.ndim == 2 and table.shape[0] == 4 and (
+                    public_cases is None or table.shape[1] == len(public_cases)):
+                return table
+    except (OSError, ValueError):
+        pass
+    
+    if public_cases is None:
+        public_cases = read_json(PUBLIC_CASES_PATH)
+    
+    table = build_case_table(public_cases)
+    try:
+        np.save(TEST_ARRAYS_PATH, table)
+    except OSError:
+        # Read-only checkout; parse the JSON again next time
+        pass
+    return table
@@ -10,22 +10,73 @@ Strategy: If there's ONE true analytical function, our case-specific
 formulas are likely different expressions of it under different conditions.
 """
 
-import json
 import numpy as np
-import pandas as pd
 from collections import defaultdict
-import math
+from case_arrays import PUBLIC_CASES_PATH, read_json, load_case_arrays
 
 def load_data():
     """Load public cases and discovered formulas"""
-    with open('public_cases.json', 'r') as f:
-        public_cases = json.load(f)
-    
-    with open('all_exact_formulas_v4_PERFECT.json', 'r') as f:
-        formulas = json.load(f)
+    public_cases = read_json(PUBLIC_CASES_PATH)
+    formulas = read_json('all_exact_formulas_v4_PERFECT.json')
     
     return public_cases, formulas
 
+def search_function_terms(days, miles, receipts):
+    """Stack the terms of the parameterized search function into a (6, N) array"""
+    return np.stack([
+        days,  # base per day
+        miles,  # mileage rate
+        receipts,  # receipt rate
+        np.ones_like(days),  # base constant
+        (days * miles) / 1000,  # interaction term
+        np.log1p(receipts),  # logarithmic receipt scaling
+    ])
+
+def search_function_predict(params, terms):
+    """
+    Evaluate a*days + b*miles + c*receipts + d + e*(days*miles)/1000 + f*log(receipts+1).
+    
+    terms comes from search_function_terms, built once per search so the
+    interaction and log1p columns are not recomputed on every call. The
+    sum is one dot product of the parameters with those terms, which the
+    BLAS kernel computes with fused multiply-adds. Results can differ from
+    the written-out expression in the last bit or so.
+    """
+    return np.asarray(params, dtype=np.float64) @ terms
+
+def total_absolute_error(params, terms, expected):
+    """Total absolute error of the parameterized search function over all cases"""
+    # Reject diverged parameter vectors up front rather than letting NaN/inf
+    # propagate through the sum
+    if not np.all(np.isfinite(params)):
+        return np.inf
+    
+    predicted = search_function_predict(params, terms)
+    
+    return np.abs(predicted - expected).sum()
+
+def squared_error_objective(params, terms, expected):
+    """
+    Sum of squared errors of the search function and its analytic gradient.
+    
+    The function is linear in its parameters, so the gradient is just the
+    residuals projected onto each term. Returns (loss, grad) for use with
+    minimize(..., jac=True).
+    """
+    residuals = search_function_predict(params, terms) - expected
+    return residuals @ residuals, 2 * (terms @ residuals)
+
+COEFF_FIELDS = [
+    'case_num', 'days', 'miles', 'receipts', 'expected',
+    'coeff_days', 'coeff_miles', 'coeff_receipts', 'coeff_constant',
+]
+
+def most_common_values(values, limit=10):
+    """Return (value, count) pairs for the most frequent values, ties in order of first appearance"""
+    unique, first_index, counts = np.unique(values, return_index=True, return_counts=True)
+    order = np.lexsort((first_index, -counts))[:limit]
+    return list(zip(unique[order].tolist(), counts[order].tolist()))
+
 def analyze_coefficient_patterns(public_cases, formulas):
     """Analyze patterns in formula coefficients vs input parameters"""
     
@@ -47,84 +98,67 @@ def analyze_coefficient_patterns(public_cases, formulas):
     if len(linear_formulas) > 100:
         print(f"\n=== ANALYZING {len(linear_formulas)} LINEAR FORMULAS ===")
         
-        # Extract coefficients and inputs
-        coeffs_data = []
+        # Extract coefficients and inputs as one column per field; each column
+        # keeps the dtype of its values so integer coefficients print as ints
+        columns = {field: [] for field in COEFF_FIELDS}
         for formula in linear_formulas:
             case_num = formula['case_num']
             if case_num <= len(public_cases):
                 case = public_cases[case_num - 1]
                 input_data = case['input']
                 
-                days = input_data['trip_duration_days']
-                miles = input_data['miles_traveled']
-                receipts = input_data['total_receipts_amount']
-                expected = case['expected_output']
-                
                 coeffs = formula.get('coeffs', [])
                 if len(coeffs) >= 3:
-                    coeffs_data.append({
-                        'case_num': case_num,
-                        'days': days,
-                        'miles': miles,
-                        'receipts': receipts,
-                        'expected': expected,
-                        'coeff_days': coeffs[0],
-                        'coeff_miles': coeffs[1],
-                        'coeff_receipts': coeffs[2],
-                        'coeff_constant': coeffs[3] if len(coeffs) > 3 else 0,
-                        'formula_type': formula['formula_type']
-                    })
+                    columns['case_num'].append(case_num)
+                    columns['days'].append(input_data['trip_duration_days'])
+                    columns['miles'].append(input_data['miles_traveled'])
+                    columns['receipts'].append(input_data['total_receipts_amount'])
+                    columns['expected'].append(case['expected_output'])
+                    columns['coeff_days'].append(coeffs[0])
+                    columns['coeff_miles'].append(coeffs[1])
+                    columns['coeff_receipts'].append(coeffs[2])
+                    columns['coeff_constant'].append(coeffs[3] if len(coeffs) > 3 else 0)
         
-        df = pd.DataFrame(coeffs_data)
-        print(f"Analyzing {len(df)} linear formulas with coefficients")
+        coeff_data = np.rec.fromarrays(
+            [np.array(columns[field]) for field in COEFF_FIELDS],
+            names=COEFF_FIELDS
+        )
+        print(f"Analyzing {len(coeff_data)} linear formulas with coefficients")
         
         # Look for coefficient patterns
         print(f"\n=== COEFFICIENT STATISTICS ===")
-        print(f"Days coefficient:     mean={df['coeff_days'].mean():.3f}, std={df['coeff_days'].std():.3f}")
-        print(f"Miles coefficient:    mean={df['coeff_miles'].mean():.3f}, std={df['coeff_miles'].std():.3f}")
-        print(f"Receipts coefficient: mean={df['coeff_receipts'].mean():.3f}, std={df['coeff_receipts'].std():.3f}")
-        print(f"Constant term:        mean={df['coeff_constant'].mean():.3f}, std={df['coeff_constant'].std():.3f}")
+        for label, field in [
+            ('Days coefficient:    ', 'coeff_days'),
+            ('Miles coefficient:   ', 'coeff_miles'),
+            ('Receipts coefficient:', 'coeff_receipts'),
+            ('Constant term:       ', 'coeff_constant'),
+        ]:
+            values = coeff_data[field]
+            print(f"{label} mean={values.mean():.3f}, std={values.std(ddof=1):.3f}")
         
         # Look for relationships between coefficients and inputs
         print(f"\n=== COEFFICIENT vs INPUT CORRELATIONS ===")
-        correlations = [
-            ('Days coeff vs Days input', df['coeff_days'].corr(df['days'])),
-            ('Days coeff vs Miles input', df['coeff_days'].corr(df['miles'])),
-            ('Days coeff vs Receipts input', df['coeff_days'].corr(df['receipts'])),
-            ('Miles coeff vs Days input', df['coeff_miles'].corr(df['days'])),
-            ('Miles coeff vs Miles input', df['coeff_miles'].corr(df['miles'])),
-            ('Miles coeff vs Receipts input', df['coeff_miles'].corr(df['receipts'])),
-            ('Receipts coeff vs Days input', df['coeff_receipts'].corr(df['days'])),
-            ('Receipts coeff vs Miles input', df['coeff_receipts'].corr(df['miles'])),
-            ('Receipts coeff vs Receipts input', df['coeff_receipts'].corr(df['receipts'])),
-        ]
-        
-        for desc, corr in correlations:
-            if not pd.isna(corr):
-                print(f"  {desc}: {corr:.3f}")
+        for coeff_label, coeff_field in [('Days', 'coeff_days'), ('Miles', 'coeff_miles'), ('Receipts', 'coeff_receipts')]:
+            for input_label, input_field in [('Days', 'days'), ('Miles', 'miles'), ('Receipts', 'receipts')]:
+                # A constant column has no defined correlation; skip it like the NaN check did
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    corr = np.corrcoef(coeff_data[coeff_field], coeff_data[input_field])[0, 1]
+                if not np.isnan(corr):
+                    print(f"  {coeff_label} coeff vs {input_label} input: {corr:.3f}")
         
         # Look for common coefficient values
         print(f"\n=== MOST COMMON COEFFICIENT VALUES ===")
         
-        # Days coefficients
-        days_coeffs = df['coeff_days'].round(1).value_counts().head(10)
-        print(f"Top days coefficients:")
-        for coeff, count in days_coeffs.items():
-            print(f"  {coeff}: {count} cases")
-        
-        # Miles coefficients  
-        miles_coeffs = df['coeff_miles'].round(2).value_counts().head(10)
-        print(f"Top miles coefficients:")
-        for coeff, count in miles_coeffs.items():
-            print(f"  {coeff}: {count} cases")
-        
-        # Receipts coefficients
-        receipts_coeffs = df['coeff_receipts'].round(2).value_counts().head(10)
-        print(f"Top receipts coefficients:")
-        for coeff, count in receipts_coeffs.items():
-            print(f"  {coeff}: {count} cases")
+        for label, field, decimals in [
+            ('days', 'coeff_days', 1),
+            ('miles', 'coeff_miles', 2),
+            ('receipts', 'coeff_receipts', 2),
+        ]:
+            print(f"Top {label} coefficients:")
+            for coeff, count in most_common_values(np.round(coeff_data[field], decimals)):
+                print(f"  {coeff}: {count} cases")
             
-        return df
+        return coeff_data
     
     return None
 
@@ -134,14 +168,7 @@ def test_universal_functions(public_cases):
     print(f"\n=== TESTING UNIVERSAL ANALYTICAL FUNCTIONS ===")
     
     # Prepare test data
-    test_data = []
-    for case in public_cases:
-        input_data = case['input']
-        days = input_data['trip_duration_days']
-        miles = input_data['miles_traveled']
-        receipts = input_data['total_receipts_amount']
-        expected = case['expected_output']
-        test_data.append((days, miles, receipts, expected))
+    days, miles, receipts, expected = load_case_arrays(public_cases)
     
     candidates = [
         # Candidate 1: Simple business rates
@@ -161,21 +188,21 @@ def test_universal_functions(public_cases):
         # Candidate 3: Logarithmic receipt scaling
         {
             'name': 'Log Receipt Scaling',
-            'formula': lambda d, m, r: 90 * d + 0.55 * m + 100 * math.log1p(r),
+            'formula': lambda d, m, r: 90 * d + 0.55 * m + 100 * np.log1p(r),
             'desc': '90*days + 0.55*miles + 100*log(receipts+1)'
         },
         
         # Candidate 4: Distance-based rates
         {
             'name': 'Distance-Based Rates',
-            'formula': lambda d, m, r: 75 * d + (0.5 + 0.1 * min(d, 10)) * m + 0.7 * r,
+            'formula': lambda d, m, r: 75 * d + (0.5 + 0.1 * np.minimum(d, 10)) * m + 0.7 * r,
             'desc': '75*days + (0.5 + 0.1*min(days,10))*miles + 0.7*receipts'
         },
         
         # Candidate 5: Receipt percentage based on trip length
         {
             'name': 'Trip-Length Receipt %',
-            'formula': lambda d, m, r: 85 * d + 0.58 * m + (0.6 + 0.05 * min(d, 8)) * r,
+            'formula': lambda d, m, r: 85 * d + 0.58 * m + (0.6 + 0.05 * np.minimum(d, 8)) * r,
             'desc': '85*days + 0.58*miles + (0.6 + 0.05*min(days,8))*receipts'
         }
     ]
@@ -188,19 +215,15 @@ def test_universal_functions(public_cases):
         print(f"Formula: {candidate['desc']}")
         
         try:
-            errors = []
-            exact_matches = 0
+            # Each candidate is evaluated once over the whole case arrays; the
+            # residuals reuse the prediction buffer instead of allocating more
+            errors = candidate['formula'](days, miles, receipts)
+            np.subtract(errors, expected, out=errors)
+            np.abs(errors, out=errors)
+            exact_matches = np.count_nonzero(errors < 0.01)
             
-            for days, miles, receipts, expected in test_data:
-                predicted = candidate['formula'](days, miles, receipts)
-                error = abs(predicted - expected)
-                errors.append(error)
-                
-                if error < 0.01:
-                    exact_matches += 1
-            
-            avg_error = np.mean(errors)
-            max_error = np.max(errors)
+            avg_error = errors.mean()
+            max_error = errors.max()
             score = avg_error * 100 + (1000 - exact_matches) * 0.1
             
             print(f"  Exact matches: {exact_matches}/1000 ({exact_matches/10:.1f}%)")
@@ -233,41 +256,9 @@ def search_for_perfect_function(public_cases):
     
     from scipy.optimize import minimize
     
-    def test_function(params, test_data):
-        """Test a parameterized function"""
-        total_error = 0
-        for days, miles, receipts, expected in test_data:
-            try:
-                # Parameterized function: base rate per day + mileage + receipt percentage + adjustments
-                a, b, c, d, e, f = params
-                
-                # Complex function with conditional logic
-                predicted = (
-                    a * days +  # base per day
-                    b * miles +  # mileage rate
-                    c * receipts +  # receipt rate
-                    d +  # base constant
-                    e * (days * miles) / 1000 +  # interaction term
-                    f * math.log1p(receipts)  # logarithmic receipt scaling
-                )
-                
-                error = abs(predicted - expected)
-                total_error += error
-                
-            except:
-                total_error += 1000  # Heavy penalty for invalid calculations
-        
-        return total_error
-    
     # Prepare test data
-    test_data = []
-    for case in public_cases:
-        input_data = case['input']
-        days = input_data['trip_duration_days']
-        miles = input_data['miles_traveled']
-        receipts = input_data['total_receipts_amount']
-        expected = case['expected_output']
-        test_data.append((days, miles, receipts, expected))
+    days, miles, receipts, expected = load_case_arrays(public_cases)
+    terms = search_function_terms(days, miles, receipts)
     
     # Try multiple starting points
     starting_points = [
@@ -280,23 +271,29 @@ def search_for_perfect_function(public_cases):
     best_params = None
     best_error = float('inf')
     
+    # The starting points are cheap, independent runs; fit them one after
+    # another and report them in order
     for i, start_params in enumerate(starting_points):
         print(f"\nOptimizing from starting point {i+1}...")
         
         try:
             result = minimize(
-                test_function,
+                squared_error_objective,
                 start_params,
-                args=(test_data,),
-                method='Nelder-Mead',
+                args=(terms, expected),
+                method='L-BFGS-B',
+                jac=True,
                 options={'maxiter': 1000}
             )
             
-            if result.fun < best_error:
-                best_error = result.fun
+            # The fit minimizes squared error, but runs are compared and
+            # reported on total absolute error like the rest of the analysis
+            total_error = total_absolute_error(result.x, terms, expected)
+            if total_error < best_error:
+                best_error = total_error
                 best_params = result.x
                 
-            print(f"  Total error: {result.fun:.2f}")
+            print(f"  Total error: {total_error:.2f}")
             print(f"  Parameters: {[f'{p:.3f}' for p in result.x]}")
             
         except Exception as e:
@@ -308,19 +305,11 @@ def search_for_perfect_function(public_cases):
         print(f"Formula: {a:.3f}*days + {b:.3f}*miles + {c:.3f}*receipts + {d:.3f} + {e:.3f}*(days*miles)/1000 + {f:.3f}*log(receipts+1)")
         
         # Test the best function
-        exact_matches = 0
-        errors = []
-        for days, miles, receipts, expected in test_data:
-            predicted = (
-                a * days + b * miles + c * receipts + d +
-                e * (days * miles) / 1000 + f * math.log1p(receipts)
-            )
-            error = abs(predicted - expected)
-            errors.append(error)
-            if error < 0.01:
-                exact_matches += 1
+        predicted = search_function_predict(best_params, terms)
+        errors = np.abs(predicted - expected)
+        exact_matches = int((errors < 0.01).sum())
         
-        avg_error = np.mean(errors)
+        avg_error = errors.mean()
         score = avg_error * 100 + (1000 - exact_matches) * 0.1
         
         print(f"Exact matches: {exact_matches}/1000 ({exact_matches/10:.1f}%)")
@@ -341,7 +330,7 @@ def main():
     print(f"Loaded {len(public_cases)} public cases and {len(formulas)} discovered formulas")
     
     # Phase 1: Analyze coefficient patterns
-    linear_df = analyze_coefficient_patterns(public_cases, formulas)
+    analyze_coefficient_patterns(public_cases, formulas)
     
     # Phase 2: Test universal functions
     test_universal_functions(public_cases)
@@ -32,36 +32,32 @@ This research was instrumental in achieving the perfect score goal.
 The discovered formulas are stored in all_exact_formulas_v4_PERFECT.json
 """
 
-import json
 import numpy as np
-import math
 import itertools
-from collections import defaultdict
 import multiprocessing as mp
 from functools import partial
+from case_arrays import read_json, write_json, load_case_arrays
+from formula_grid_search import (test_linear_formula_expanded_batch, test_polynomial_formulas,
+                                 test_interaction_formulas, test_segmented_formulas)
 
 # Load data
-with open('public_cases.json', 'r') as f:
-    cases = json.load(f)
-
-with open('exact_formulas_found.json', 'r') as f:
-    existing_formulas = json.load(f)
+case_table = load_case_arrays()
+existing_formulas = read_json('exact_formulas_found.json')
 
 # Get unsolved cases
 existing_case_nums = {f['case_num'] for f in existing_formulas}
 unsolved_cases = []
 
-for i, case in enumerate(cases):
+for i, (days, miles, receipts, expected) in enumerate(zip(*(column.tolist() for column in case_table))):
     if (i + 1) not in existing_case_nums:
-        inp = case['input']
         unsolved_cases.append({
             'case_num': i + 1,
-            'days': inp['trip_duration_days'],
-            'miles': inp['miles_traveled'],
-            'receipts': inp['total_receipts_amount'],
-            'expected': case['expected_output'],
-            'mpd': inp['miles_traveled'] / inp['trip_duration_days'],
-            'rpd': inp['total_receipts_amount'] / inp['trip_duration_days']
+            'days': int(days),
+            'miles': miles,
+            'receipts': receipts,
+            'expected': expected,
+            'mpd': miles / days,
+            'rpd': receipts / days
         })
 
 print(f"🔍 COMPREHENSIVE FORMULA SEARCH V2")
@@ -70,210 +66,40 @@ print("=" * 70)
 
 new_formulas_found = []
 
-def test_linear_formula_expanded(case):
-    """Phase 1: Expanded linear formula search"""
-    days, miles, receipts, expected = case['days'], case['miles'], case['receipts'], case['expected']
-    case_num = case['case_num']
-    
-    # Expanded coefficient ranges (Opus 4 plan)
-    days_coeffs = range(10, 251, 2)  # Much broader range
-    miles_coeffs = [x/100 for x in range(5, 201, 5)]  # 0.05 to 2.0
-    receipts_coeffs = [x/100 for x in range(5, 201, 5)]  # 0.05 to 2.0
-    constants = range(-200, 201, 10)  # Add constant terms
-    
-    # Test with and without constants
-    for a in days_coeffs:
-        for b in miles_coeffs:
-            for c in receipts_coeffs:
-                # Linear formula without constant
-                predicted = a * days + b * miles + c * receipts
-                if abs(predicted - expected) < 0.01:
-                    return {
-                        'case_num': case_num,
-                        'formula_type': 'linear_expanded',
-                        'coeffs': [a, b, c],
-                        'formula': f"{a}*{days} + {b}*{miles:.1f} + {c}*{receipts:.2f} = {expected:.2f}",
-                        'error': abs(predicted - expected)
-                    }
-                
-                # Linear formula with constant
-                for d in constants:
-                    predicted = a * days + b * miles + c * receipts + d
-                    if abs(predicted - expected) < 0.01:
-                        return {
-                            'case_num': case_num,
-                            'formula_type': 'linear_with_constant',
-                            'coeffs': [a, b, c, d],
-                            'formula': f"{a}*{days} + {b}*{miles:.1f} + {c}*{receipts:.2f} + {d} = {expected:.2f}",
-                            'error': abs(predicted - expected)
-                        }
-    
-    return None
-
-def test_polynomial_formulas(case):
-    """Phase 2: Polynomial and non-linear formula search"""
-    days, miles, receipts, expected = case['days'], case['miles'], case['receipts'], case['expected']
-    case_num = case['case_num']
-    
-    # Coefficient ranges for non-linear terms
-    coeffs = [x/10 for x in range(1, 201, 5)]  # 0.1 to 20.0
-    
-    try:
-        for a in coeffs:
-            for b in coeffs:
-                for c in coeffs:
-                    # Quadratic patterns
-                    patterns = [
-                        ('quad_days', a * days * days + b * miles + c * receipts),
-                        ('quad_miles', a * days + b * miles * miles + c * receipts),
-                        ('quad_receipts', a * days + b * miles + c * receipts * receipts),
-                        
-                        # Square root patterns
-                        ('sqrt_miles', a * days + b * math.sqrt(miles) + c * receipts),
-                        ('sqrt_receipts', a * days + b * miles + c * math.sqrt(receipts)),
-                        
-                        # Logarithmic patterns
-                        ('log_miles', a * days + b * math.log1p(miles) + c * receipts),
-                        ('log_receipts', a * days + b * miles + c * math.log1p(receipts)),
-                        
-                        # Power patterns
-                        ('power_miles', a * days + b * (miles ** 0.5) + c * receipts),
-                        ('power_receipts', a * days + b * miles + c * (receipts ** 0.5)),
-                    ]
-                    
-                    for pattern_name, predicted in patterns:
-                        if abs(predicted - expected) < 0.01:
-                            return {
-                                'case_num': case_num,
-                                'formula_type': pattern_name,
-                                'coeffs': [a, b, c],
-                                'formula': f"{pattern_name}({a}, {b}, {c}) = {expected:.2f}",
-                                'error': abs(predicted - expected)
-                            }
-    except:
-        pass
-    
-    return None
-
-def test_interaction_formulas(case):
-    """Phase 2: Interaction term formulas"""
-    days, miles, receipts, expected = case['days'], case['miles'], case['receipts'], case['expected']
-    case_num = case['case_num']
-    
-    coeffs = [x/10 for x in range(1, 101, 5)]  # 0.1 to 10.0
-    
-    for a in coeffs:
-        for b in coeffs:
-            for c in coeffs:
-                for d in coeffs:
-                    try:
-                        # Two-way interactions
-                        patterns = [
-                            ('days_miles_int', a * days + b * miles + c * receipts + d * (days * miles)),
-                            ('days_receipts_int', a * days + b * miles + c * receipts + d * (days * receipts)),
-                            ('miles_receipts_int', a * days + b * miles + c * receipts + d * (miles * receipts)),
-                            
-                            # Three-way interaction
-                            ('three_way_int', a * days + b * miles + c * receipts + d * (days * miles * receipts) ** 0.33),
-                            
-                            # Ratio interactions
-                            ('ratio_int', a * days + b * miles + c * receipts + d * (miles / max(days, 1))),
-                        ]
-                        
-                        for pattern_name, predicted in patterns:
-                            if abs(predicted - expected) < 0.01:
-                                return {
-                                    'case_num': case_num,
-                                    'formula_type': pattern_name,
-                                    'coeffs': [a, b, c, d],
-                                    'formula': f"{pattern_name}({a}, {b}, {c}, {d}) = {expected:.2f}",
-                                    'error': abs(predicted - expected)
-                                }
-                    except:
-                        continue
-    
-    return None
-
-def test_segmented_formulas(case):
-    """Phase 3: Segmented analysis by case characteristics"""
-    days, miles, receipts, expected = case['days'], case['miles'], case['receipts'], case['expected']
-    case_num = case['case_num']
-    mpd = case['mpd']
-    rpd = case['rpd']
-    
-    # Different formula sets for different segments
-    coeffs = [x/10 for x in range(1, 151, 5)]
-    
-    for a in coeffs:
-        for b in coeffs:
-            for c in coeffs:
-                try:
-                    # Segment by trip duration
-                    if days == 1:
-                        # Single day special formulas
-                        predicted = a * 100 + b * miles + c * receipts
-                    elif days <= 3:
-                        # Short trip formulas
-                        predicted = a * days * 80 + b * miles + c * receipts
-                    elif days <= 7:
-                        # Medium trip formulas
-                        predicted = a * days * 60 + b * miles + c * receipts
-                    else:
-                        # Long trip formulas
-                        predicted = a * days * 40 + b * miles + c * receipts
-                    
-                    if abs(predicted - expected) < 0.01:
-                        return {
-                            'case_num': case_num,
-                            'formula_type': 'segmented_duration',
-                            'coeffs': [a, b, c],
-                            'segment': f"{days}_days",
-                            'formula': f"segmented_duration({a}, {b}, {c}) = {expected:.2f}",
-                            'error': abs(predicted - expected)
-                        }
-                    
-                    # Segment by efficiency
-                    if mpd < 100:
-                        predicted = a * days + b * miles * 1.2 + c * receipts  # Low efficiency penalty
-                    elif mpd > 250:
-                        predicted = a * days + b * miles * 0.8 + c * receipts  # High efficiency bonus
-                    else:
-                        predicted = a * days + b * miles + c * receipts
-                    
-                    if abs(predicted - expected) < 0.01:
-                        return {
-                            'case_num': case_num,
-                            'formula_type': 'segmented_efficiency',
-                            'coeffs': [a, b, c],
-                            'segment': f"{int(mpd)}_mpd",
-                            'formula': f"segmented_efficiency({a}, {b}, {c}) = {expected:.2f}",
-                            'error': abs(predicted - expected)
-                        }
-                        
-                except:
-                    continue
-    
-    return None
-
 def process_case_batch(cases_batch):
     """Process a batch of cases with all formula types"""
-    batch_results = []
+    found = {}
+    unsolved = cases_batch
     
-    for case in cases_batch:
-        # Try different formula types in order of complexity
-        formula_tests = [
-            test_linear_formula_expanded,
-            test_polynomial_formulas,
-            test_interaction_formulas,
-            test_segmented_formulas
-        ]
+    # Run the formula types in order of complexity, one phase at a time over
+    # the whole batch, so each later (and costlier) phase only sees the cases
+    # the earlier ones left unsolved. The linear phase is vectorized across
+    # cases; the others take one case at a time.
+    formula_tests = [
+        test_linear_formula_expanded_batch,
+        test_polynomial_formulas,
+        test_interaction_formulas,
+        test_segmented_formulas
+    ]
+    
+    for test_func in formula_tests:
+        if not unsolved:
+            break
+        
+        if test_func is test_linear_formula_expanded_batch:
+            phase_results = test_func(unsolved)
+        else:
+            phase_results = [test_func(case) for case in unsolved]
         
-        for test_func in formula_tests:
-            result = test_func(case)
+        for result in phase_results:
             if result:
-                batch_results.append(result)
-                print(f"✓ Case {result['case_num']}: {result['formula_type']} formula found!")
-                break  # Found formula for this case, move to next
+                found[result['case_num']] = result
+        unsolved = [case for case, result in zip(unsolved, phase_results) if not result]
+    
+    batch_results = [found[case['case_num']] for case in cases_batch if case['case_num'] in found]
+    # One write per batch, so lines from workers finishing together never interleave
+    if batch_results:
+        print('\n'.join(f"✓ Case {result['case_num']}: {result['formula_type']} formula found!" for result in batch_results))
     
     return batch_results
 
@@ -281,29 +107,62 @@ def process_case_batch(cases_batch):
 print("\n🔍 Phase 1-3: Comprehensive Formula Search")
 print("-" * 50)
 
+# Every search depends only on (days, miles, receipts, expected), so cases
+# that repeat those values are searched once and share the formula found.
+# np.unique over the rows finds the repeats; the first case of each group
+# (in input order) is the one searched and the rest copy its result.
+case_rows = np.array([[case['days'], case['miles'], case['receipts'], case['expected']] for case in unsolved_cases], dtype=np.float64).reshape(-1, 4)
+_, first_index, group_ids = np.unique(case_rows, axis=0, return_index=True, return_inverse=True)
+representative = first_index[group_ids]
+
+search_cases = [unsolved_cases[i] for i in np.sort(first_index)]
+duplicate_cases = {case['case_num']: [] for case in search_cases}
+for i in np.flatnonzero(representative != np.arange(len(unsolved_cases))):
+    duplicate_cases[unsolved_cases[representative[i]]['case_num']].append(unsolved_cases[i])
+
 # Process cases in batches for efficiency
 batch_size = 50
-case_batches = [unsolved_cases[i:i+batch_size] for i in range(0, len(unsolved_cases), batch_size)]
+case_batches = [search_cases[i:i+batch_size] for i in range(0, len(search_cases), batch_size)]
 
-print(f"Processing {len(unsolved_cases)} cases in {len(case_batches)} batches...")
+print(f"Processing {len(unsolved_cases)} cases ({len(search_cases)} distinct) in {len(case_batches)} batches...")
+
+# Batches are independent, so search them in worker processes. The workers
+# are forked so they inherit the loaded cases instead of re-running this
+# script; where fork is unavailable the batches run in this process.
+if 'fork' in mp.get_all_start_methods():
+    pool = mp.get_context('fork').Pool()
+    batch_results_iter = pool.imap(process_case_batch, case_batches)
+else:
+    pool = None
+    batch_results_iter = map(process_case_batch, case_batches)
 
 all_new_formulas = []
-for i, batch in enumerate(case_batches):
-    print(f"Processing batch {i+1}/{len(case_batches)}...")
-    batch_results = process_case_batch(batch)
+for i, batch_results in enumerate(batch_results_iter):
+    print(f"Finished batch {i+1}/{len(case_batches)}...")
     all_new_formulas.extend(batch_results)
+    
+    for result in batch_results:
+        for duplicate in duplicate_cases[result['case_num']]:
+            all_new_formulas.append(dict(result, case_num=duplicate['case_num']))
+            print(f"✓ Case {duplicate['case_num']}: {result['formula_type']} formula reused from case {result['case_num']}")
+
+if pool is not None:
+    pool.close()
+    pool.join()
 
 print(f"\n🎯 PHASE 1-3 RESULTS:")
 print(f"Found {len(all_new_formulas)} new exact formulas!")
 
-# Analyze formula types found
-formula_types = defaultdict(int)
-for formula in all_new_formulas:
-    formula_types[formula['formula_type']] += 1
+# Analyze formula types found: count each type in one np.unique pass and
+# list them by count, ties in order of first appearance
+formula_type_names, first_index, type_counts = np.unique(
+    [formula['formula_type'] for formula in all_new_formulas],
+    return_index=True, return_counts=True
+)
 
 print("\nFormula types discovered:")
-for ftype, count in sorted(formula_types.items(), key=lambda x: x[1], reverse=True):
-    print(f"  {ftype}: {count} formulas")
+for k in np.lexsort((first_index, -type_counts)):
+    print(f"  {formula_type_names[k]}: {type_counts[k]} formulas")
 
 # Phase 4: Pattern mining on remaining cases
 remaining_cases = []
@@ -318,57 +177,87 @@ print("-" * 50)
 
 def cluster_similar_cases(cases):
     """Group similar cases that might share formulas"""
-    clusters = defaultdict(list)
+    if not cases:
+        return {}
     
-    for case in cases:
-        # Create clustering key based on characteristics
-        days_bucket = case['days']
-        miles_bucket = int(case['miles'] / 100) * 100
-        receipts_bucket = int(case['receipts'] / 200) * 200
-        
-        cluster_key = f"d{days_bucket}_m{miles_bucket}_r{receipts_bucket}"
-        clusters[cluster_key].append(case)
+    # Create clustering key based on characteristics: the bucket of every
+    # case is computed in one pass, truncating like int() does
+    days_bucket = np.array([case['days'] for case in cases], dtype=np.int64)
+    miles_bucket = (np.array([case['miles'] for case in cases], dtype=np.float64) / 100).astype(np.int64) * 100
+    receipts_bucket = (np.array([case['receipts'] for case in cases], dtype=np.float64) / 200).astype(np.int64) * 200
+    
+    # One np.unique pass assigns each case its cluster; clusters are kept in
+    # order of first appearance and cases in input order within a cluster
+    buckets = np.stack([days_bucket, miles_bucket, receipts_bucket], axis=1)
+    unique_buckets, first_index, cluster_ids = np.unique(buckets, axis=0, return_index=True, return_inverse=True)
+    members = np.argsort(cluster_ids, kind='stable')
+    bounds = np.cumsum(np.bincount(cluster_ids))
+    
+    clusters = {}
+    for k in np.argsort(first_index):
+        d, m, r = unique_buckets[k].tolist()
+        start = bounds[k - 1] if k > 0 else 0
+        clusters[f"d{d}_m{m}_r{r}"] = [cases[i] for i in members[start:bounds[k]]]
     
     return clusters
 
-def find_cluster_formula(cluster_cases):
-    """Find a formula that works for multiple cases in a cluster"""
-    if len(cluster_cases) < 2:
-        return None
+CLUSTER_COEFFS = [x/10 for x in range(5, 51, 5)]  # 0.5 to 5.0
+
+CLUSTER_A = np.array(CLUSTER_COEFFS, dtype=np.float64)[:, None, None]
+CLUSTER_B = np.array(CLUSTER_COEFFS, dtype=np.float64)[None, :, None]
+CLUSTER_C = np.array(CLUSTER_COEFFS, dtype=np.float64)[None, None, :]
+
+def find_cluster_formulas(clusters):
+    """
+    Find a formula that works for multiple cases in each cluster.
+    
+    The grid is evaluated once for the cases of every cluster with two or
+    more members, stacked cluster by cluster, and the per-cluster match
+    counts are segment sums over that stack. Returns {cluster_key: formula}
+    for the clusters that share a formula, in cluster order.
+    """
+    keys = [key for key, cluster_cases in clusters.items() if len(cluster_cases) >= 2]
+    if not keys:
+        return {}
     
-    # Test if a single formula can handle multiple cases in cluster
-    coeffs = [x/10 for x in range(5, 51, 5)]
+    stacked = [case for key in keys for case in clusters[key]]
+    starts = np.cumsum([0] + [len(clusters[key]) for key in keys[:-1]])
     
-    for a in coeffs:
-        for b in coeffs:
-            for c in coeffs:
-                matches = 0
-                for case in cluster_cases:
-                    predicted = a * case['days'] + b * case['miles'] + c * case['receipts']
-                    if abs(predicted - case['expected']) < 0.01:
-                        matches += 1
-                
-                if matches >= 2:  # Formula works for multiple cases
-                    return {
-                        'formula_type': 'cluster_formula',
-                        'coeffs': [a, b, c],
-                        'matches': matches,
-                        'cases': [c['case_num'] for c in cluster_cases if 
-                                abs(a * c['days'] + b * c['miles'] + c * c['receipts'] - c['expected']) < 0.01]
-                    }
+    shape = (len(stacked), 1, 1, 1)
+    days = np.array([case['days'] for case in stacked], dtype=np.float64).reshape(shape)
+    miles = np.array([case['miles'] for case in stacked], dtype=np.float64).reshape(shape)
+    receipts = np.array([case['receipts'] for case in stacked], dtype=np.float64).reshape(shape)
+    expected = np.array([case['expected'] for case in stacked], dtype=np.float64).reshape(shape)
+    
+    predicted = CLUSTER_A * days + CLUSTER_B * miles + CLUSTER_C * receipts
+    hits = np.abs(predicted - expected) < 0.01
+    matches = np.add.reduceat(hits, starts, axis=0, dtype=np.intp)
+    
+    # Formula works for multiple cases
+    shared = (matches >= 2).reshape(len(keys), -1)
+    first_shared = np.argmax(shared, axis=1)
+    
+    cluster_formulas = {}
+    for k in np.flatnonzero(shared[np.arange(len(keys)), first_shared]):
+        ai, bi, ci = np.unravel_index(first_shared[k], matches.shape[1:])
+        cluster_cases = clusters[keys[k]]
+        cluster_hits = hits[starts[k]:starts[k] + len(cluster_cases), ai, bi, ci]
+        cluster_formulas[keys[k]] = {
+            'formula_type': 'cluster_formula',
+            'coeffs': [CLUSTER_COEFFS[ai], CLUSTER_COEFFS[bi], CLUSTER_COEFFS[ci]],
+            'matches': int(matches[k, ai, bi, ci]),
+            'cases': [case['case_num'] for case, hit in zip(cluster_cases, cluster_hits) if hit]
+        }
     
-    return None
+    return cluster_formulas
 
 # Cluster remaining cases and find shared formulas
 clusters = cluster_similar_cases(remaining_cases)
 cluster_formulas = []
 
-for cluster_key, cluster_cases in clusters.items():
-    if len(cluster_cases) >= 2:
-        cluster_formula = find_cluster_formula(cluster_cases)
-        if cluster_formula:
-            cluster_formulas.append(cluster_formula)
-            print(f"✓ Cluster {cluster_key}: Formula works for {cluster_formula['matches']} cases")
+for cluster_key, cluster_formula in find_cluster_formulas(clusters).items():
+    cluster_formulas.append(cluster_formula)
+    print(f"✓ Cluster {cluster_key}: Formula works for {cluster_formula['matches']} cases")
 
 # Combine all discovered formulas
 total_existing = len(existing_formulas)
@@ -395,8 +284,7 @@ for cluster_formula in cluster_formulas:
             'formula': f"cluster_formula({cluster_formula['coeffs']}) for case {case_num}"
         })
 
-with open('all_exact_formulas_v2.json', 'w') as f:
-    json.dump(all_discovered_formulas, f, indent=2)
+write_json('all_exact_formulas_v2.json', all_discovered_formulas)
 
 print(f"\n✅ All formulas saved to 'all_exact_formulas_v2.json'")
 print(f"Ready to implement ultimate perfect score model!")
@@ -6,49 +6,37 @@ Find the pattern by looking at actual coefficient relationships
 """
 
 import json
-from collections import defaultdict
+import numpy as np
 
 def main():
     with open('input_to_formula_mapping.json', 'r') as f:
         mapping = json.load(f)
     
     # Focus on linear_with_constant (641 cases) - most common
-    linear_cases = []
-    for key, formula_info in mapping.items():
-        if formula_info['formula_type'] == 'linear_with_constant':
-            parts = key.split(',')
-            days = int(float(parts[0]))
-            miles = int(float(parts[1]))
-            receipts = float(parts[2])
-            coeffs = formula_info['coeffs']
-            
-            linear_cases.append({
-                'days': days,
-                'miles': miles, 
-                'receipts': receipts,
-                'a': coeffs[0],  # days coeff
-                'b': coeffs[1],  # miles coeff  
-                'c': coeffs[2],  # receipts coeff
-                'd': coeffs[3],  # constant
-                'expected': formula_info['expected']
-            })
+    # Keys are "days,miles,receipts"; they and the coefficients are parsed
+    # into arrays once rather than into a dict per case
+    linear_keys = [key for key, formula_info in mapping.items() if formula_info['formula_type'] == 'linear_with_constant']
+    inputs = np.array([key.split(',') for key in linear_keys], dtype=np.float64).reshape(-1, 3)
+    case_days = inputs[:, 0].astype(np.int64)
+    case_miles = inputs[:, 1].astype(np.int64)
+    case_receipts = inputs[:, 2]
+    # Columns are the days coeff, miles coeff, receipts coeff and constant
+    coeffs = np.array([mapping[key]['coeffs'] for key in linear_keys], dtype=np.float64).reshape(-1, 4)
+    case_expected = np.array([mapping[key]['expected'] for key in linear_keys], dtype=np.float64)
     
-    print(f"Analyzing {len(linear_cases)} linear_with_constant cases...")
+    print(f"Analyzing {len(linear_keys)} linear_with_constant cases...")
     
-    # Group by coefficient combinations to find patterns
-    coeff_groups = defaultdict(list)
-    for case in linear_cases:
-        coeff_key = (case['a'], case['b'], case['c'], case['d'])
-        coeff_groups[coeff_key].append(case)
+    # Group by coefficient combinations to find patterns, in order of first appearance
+    _, first_index, group_ids = np.unique(coeffs, axis=0, return_index=True, return_inverse=True)
     
-    print(f"Found {len(coeff_groups)} unique coefficient combinations")
+    print(f"Found {len(first_index)} unique coefficient combinations")
     
     # Look for input patterns within each coefficient group
-    for i, (coeffs, cases) in enumerate(coeff_groups.items()):
-        if i < 5:  # Show first 5 groups
-            print(f"\nGroup {i+1}: coeffs={coeffs}, {len(cases)} cases")
-            for case in cases[:3]:  # Show first 3 cases in group
-                print(f"  days={case['days']}, miles={case['miles']}, receipts={case['receipts']:.2f}")
+    for i, group in enumerate(np.argsort(first_index)[:5]):  # Show first 5 groups
+        members = np.flatnonzero(group_ids == group)
+        print(f"\nGroup {i+1}: coeffs={tuple(mapping[linear_keys[members[0]]]['coeffs'])}, {len(members)} cases")
+        for j in members[:3]:  # Show first 3 cases in group
+            print(f"  days={case_days[j]}, miles={case_miles[j]}, receipts={case_receipts[j]:.2f}")
     
     # NEW APPROACH: Look for the simplest possible pattern
     # Maybe it's just based on input ranges or simple arithmetic
@@ -58,9 +46,8 @@ def main():
     # Test if coefficients are simple functions of inputs
     patterns_found = 0
     
-    for case in linear_cases[:50]:  # Test first 50
-        days, miles, receipts = case['days'], case['miles'], case['receipts']
-        a, b, c, d = case['a'], case['b'], case['c'], case['d']
+    for days, miles, receipts, (a, b, c, d) in zip(case_days[:50].tolist(), case_miles[:50].tolist(),
+                                                   case_receipts[:50].tolist(), coeffs[:50].tolist()):  # Test first 50
         
         # Test various simple relationships
         tests = [
@@ -83,38 +70,35 @@ def main():
     # FINAL ATTEMPT: Just try to reverse engineer from a few examples
     print("\n=== REVERSE ENGINEERING FROM EXAMPLES ===")
     
+    # Standard government rates from 1960s might be:
+    daily_rates = [75, 80, 85, 90, 95, 100]
+    mileage_rates = [0.10, 0.15, 0.20, 0.25, 0.30, 0.35, 0.40, 0.45, 0.50]
+    receipt_rates = [0.80, 0.85, 0.90, 0.95, 1.00]  # High because receipts are actual expenses
+    
+    # Try the most obvious business logic
+    # Daily allowance + mileage + receipt reimbursement
+    # Every (daily, mileage, receipt) triple is evaluated on every case in one
+    # (daily, mileage, receipt, case) broadcast, so the number of cases each
+    # triple matches is known up front instead of re-scanned per match
+    pred = (np.array(daily_rates)[:, None, None, None] * case_days
+            + np.array(mileage_rates)[None, :, None, None] * case_miles
+            + np.array(receipt_rates)[None, None, :, None] * case_receipts)
+    matches = np.abs(pred - case_expected) < 0.01
+    total_matches = matches.sum(axis=-1)
+    
     # Take first few cases and manually figure out the pattern
-    for i in range(min(10, len(linear_cases))):
-        case = linear_cases[i]
-        days, miles, receipts = case['days'], case['miles'], case['receipts']
-        expected = case['expected']
+    for i in range(min(10, len(linear_keys))):
+        days, miles, receipts = case_days[i].item(), case_miles[i].item(), case_receipts[i].item()
+        expected = mapping[linear_keys[i]]['expected']
         
-        # Try the most obvious business logic
-        # Daily allowance + mileage + receipt reimbursement
-        
-        # Standard government rates from 1960s might be:
-        daily_rates = [75, 80, 85, 90, 95, 100]
-        mileage_rates = [0.10, 0.15, 0.20, 0.25, 0.30, 0.35, 0.40, 0.45, 0.50]
-        receipt_rates = [0.80, 0.85, 0.90, 0.95, 1.00]  # High because receipts are actual expenses
-        
-        for daily in daily_rates:
-            for mileage in mileage_rates:
-                for receipt in receipt_rates:
-                    pred = daily * days + mileage * miles + receipt * receipts
-                    if abs(pred - expected) < 0.01:
-                        print(f"EXACT MATCH: {daily}*{days} + {mileage}*{miles} + {receipt}*{receipts:.2f} = {expected}")
-                        
-                        # Test this on ALL cases
-                        total_matches = 0
-                        for test_case in linear_cases:
-                            test_pred = daily * test_case['days'] + mileage * test_case['miles'] + receipt * test_case['receipts']
-                            if abs(test_pred - test_case['expected']) < 0.01:
-                                total_matches += 1
-                        
-                        if total_matches > 500:
-                            print(f"*** POTENTIAL UNIVERSAL FORMULA: {daily}*days + {mileage}*miles + {receipt}*receipts ***")
-                            print(f"Matches: {total_matches}/{len(linear_cases)} linear cases")
-                            return daily, mileage, receipt
+        for j, k, l in np.argwhere(matches[:, :, :, i]):
+            daily, mileage, receipt = daily_rates[j], mileage_rates[k], receipt_rates[l]
+            print(f"EXACT MATCH: {daily}*{days} + {mileage}*{miles} + {receipt}*{receipts:.2f} = {expected}")
+            
+            if total_matches[j, k, l] > 500:
+                print(f"*** POTENTIAL UNIVERSAL FORMULA: {daily}*days + {mileage}*miles + {receipt}*receipts ***")
+                print(f"Matches: {total_matches[j, k, l]}/{len(linear_keys)} linear cases")
+                return daily, mileage, receipt
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -7,6 +7,37 @@ RAPID UNIVERSAL FUNCTION DISCOVERY
 
 import json
 
+def find_modulo_match(days, miles, receipts, expected):
+    """First (day_mod, mile_mod, receipt_mod, a, b, c, d) whose derived coefficients reproduce expected, else None"""
+    # PATTERN HYPOTHESIS: coefficients based on input modulo operations
+    # This would explain the step patterns we see
+    
+    # Try: a = 10 + 2*(days % something), b = 0.05 * (miles % something), etc.
+    
+    # With no miles (or no receipts) every modulo base for that input gives
+    # the same prediction, so only the first one is worth trying
+    mile_mods = [10] if miles == 0 else [10, 20, 50, 100]
+    receipt_mods = [10] if receipts == 0 else [10, 20, 50]
+    
+    # Test multiple modulo bases; a case only needs to match once, so the
+    # search stops at the first hit instead of trying every remaining base
+    for day_mod in [2, 3, 4, 5, 10]:
+        for mile_mod in mile_mods:
+            for receipt_mod in receipt_mods:
+                
+                # Calculate coefficients from inputs
+                a = 10 + 2 * (int(days) % day_mod)
+                b = 0.05 + 0.05 * (int(miles) % mile_mod) 
+                c = 0.05 + 0.05 * (int(receipts * 100) % receipt_mod)
+                d = -200 + 10 * ((int(days) + int(miles)) % 40)
+                
+                # Test prediction
+                pred = a * days + b * miles + c * receipts + d
+                
+                if abs(pred - expected) < 0.01:
+                    return day_mod, mile_mod, receipt_mod, a, b, c, d
+    return None
+
 def main():
     # Load data
     with open('input_to_formula_mapping.json', 'r') as f:
@@ -34,40 +65,25 @@ def main():
         receipts = float(parts[2])
         expected = formula_info['expected']
         
-        # PATTERN HYPOTHESIS: coefficients based on input modulo operations
-        # This would explain the step patterns we see
+        match = find_modulo_match(days, miles, receipts, expected)
+        if match is None:
+            continue
         
-        # Try: a = 10 + 2*(days % something), b = 0.05 * (miles % something), etc.
+        day_mod, mile_mod, receipt_mod, a, b, c, d = match
+        correct_predictions += 1
+        if correct_predictions < 10:  # Show first few
+            print(f"MATCH: {key} -> a={a}, b={b}, c={c}, d={d}")
         
-        # Test multiple modulo bases
-        for day_mod in [2, 3, 4, 5, 10]:
-            for mile_mod in [10, 20, 50, 100]:
-                for receipt_mod in [10, 20, 50]:
-                    
-                    # Calculate coefficients from inputs
-                    a = 10 + 2 * (int(days) % day_mod)
-                    b = 0.05 + 0.05 * (int(miles) % mile_mod) 
-                    c = 0.05 + 0.05 * (int(receipts * 100) % receipt_mod)
-                    d = -200 + 10 * ((int(days) + int(miles)) % 40)
-                    
-                    # Test prediction
-                    pred = a * days + b * miles + c * receipts + d
-                    
-                    if abs(pred - expected) < 0.01:
-                        correct_predictions += 1
-                        if correct_predictions < 10:  # Show first few
-                            print(f"MATCH: {key} -> a={a}, b={b}, c={c}, d={d}")
-                        
-                        if correct_predictions >= 1000:  # Found it!
-                            print(f"\n*** UNIVERSAL FUNCTION FOUND! ***")
-                            print(f"Modulo bases: day_mod={day_mod}, mile_mod={mile_mod}, receipt_mod={receipt_mod}")
-                            print(f"Formula:")
-                            print(f"a = 10 + 2 * (days % {day_mod})")
-                            print(f"b = 0.05 + 0.05 * (miles % {mile_mod})")
-                            print(f"c = 0.05 + 0.05 * (receipts*100 % {receipt_mod})")
-                            print(f"d = -200 + 10 * ((days + miles) % 40)")
-                            print(f"reimbursement = a*days + b*miles + c*receipts + d")
-                            return day_mod, mile_mod, receipt_mod
+        if correct_predictions >= 1000:  # Found it!
+            print(f"\n*** UNIVERSAL FUNCTION FOUND! ***")
+            print(f"Modulo bases: day_mod={day_mod}, mile_mod={mile_mod}, receipt_mod={receipt_mod}")
+            print(f"Formula:")
+            print(f"a = 10 + 2 * (days % {day_mod})")
+            print(f"b = 0.05 + 0.05 * (miles % {mile_mod})")
+            print(f"c = 0.05 + 0.05 * (receipts*100 % {receipt_mod})")
+            print(f"d = -200 + 10 * ((days + miles) % 40)")
+            print(f"reimbursement = a*days + b*miles + c*receipts + d")
+            return day_mod, mile_mod, receipt_mod
     
     print(f"Best result: {correct_predictions}/1000 matches")
     
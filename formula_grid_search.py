@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+FORMULA GRID SEARCH
+===================
+
+The per-case coefficient grid searches behind phases 1-3 of
+comprehensive_formula_search_v2.py: expanded linear, polynomial,
+interaction and segmented formulas.
+
+Each search takes a case dict with days, miles, receipts, expected and
+case_num (plus mpd for the segmented search) and returns the first
+formula in grid order whose prediction is within 0.01 of the expected
+output, or None.
+"""
+
+import math
+import numpy as np
+
+# Expanded coefficient ranges (Opus 4 plan)
+EXPANDED_DAYS_COEFFS = list(range(10, 251, 2))  # Much broader range
+EXPANDED_MILES_COEFFS = [x/100 for x in range(5, 201, 5)]  # 0.05 to 2.0
+EXPANDED_RECEIPTS_COEFFS = [x/100 for x in range(5, 201, 5)]  # 0.05 to 2.0
+EXPANDED_CONSTANTS = list(range(-200, 201, 10))  # Add constant terms
+EXPANDED_CONSTANT_STEP = EXPANDED_CONSTANTS[1] - EXPANDED_CONSTANTS[0]
+
+# The same grids as float64 axes, shaped to broadcast into an (a, b, c) cube
+EXPANDED_A = np.array(EXPANDED_DAYS_COEFFS, dtype=np.float64)[:, None, None]
+EXPANDED_B = np.array(EXPANDED_MILES_COEFFS, dtype=np.float64)[None, :, None]
+EXPANDED_C = np.array(EXPANDED_RECEIPTS_COEFFS, dtype=np.float64)[None, None, :]
+EXPANDED_K = np.array(EXPANDED_CONSTANTS, dtype=np.float64)
+
+# Cases evaluated together per linear search call, and the number of days
+# coefficients per tile of the (a, b, c) grid. A tile is 16x40x40 float64
+# (200 KB) per case, so the tile's working arrays stay in L2/L3 cache
+# instead of streaming the whole 121x40x40 cube through memory.
+LINEAR_SEARCH_CHUNK = 8
+LINEAR_SEARCH_A_TILE = 16
+
+def linear_expanded_result(case, ai, bi, ci, constant_k):
+    """Build the result record for a linear hit at grid index (ai, bi, ci)"""
+    days, miles, receipts, expected = case['days'], case['miles'], case['receipts'], case['expected']
+    case_num = case['case_num']
+    a = EXPANDED_DAYS_COEFFS[ai]
+    b = EXPANDED_MILES_COEFFS[bi]
+    c = EXPANDED_RECEIPTS_COEFFS[ci]
+    
+    if constant_k < 0:
+        predicted = a * days + b * miles + c * receipts
+        return {
+            'case_num': case_num,
+            'formula_type': 'linear_expanded',
+            'coeffs': [a, b, c],
+            'formula': f"{a}*{days} + {b}*{miles:.1f} + {c}*{receipts:.2f} = {expected:.2f}",
+            'error': abs(predicted - expected)
+        }
+    
+    d = EXPANDED_CONSTANTS[constant_k]
+    predicted = a * days + b * miles + c * receipts + d
+    return {
+        'case_num': case_num,
+        'formula_type': 'linear_with_constant',
+        'coeffs': [a, b, c, d],
+        'formula': f"{a}*{days} + {b}*{miles:.1f} + {c}*{receipts:.2f} + {d} = {expected:.2f}",
+        'error': abs(predicted - expected)
+    }
+
+def test_linear_formula_expanded_batch(cases):
+    """
+    Phase 1 for many cases at once.
+    
+    Cases are stacked along a leading axis and searched against the whole
+    (a, b, c) grid in chunks of LINEAR_SEARCH_CHUNK, so each NumPy call
+    covers several cases. Returns one result (or None) per case, in order.
+    """
+    results = []
+    for start in range(0, len(cases), LINEAR_SEARCH_CHUNK):
+        chunk = cases[start:start + LINEAR_SEARCH_CHUNK]
+        shape = (len(chunk), 1, 1, 1)
+        days = np.array([case['days'] for case in chunk], dtype=np.float64).reshape(shape)
+        miles = np.array([case['miles'] for case in chunk], dtype=np.float64).reshape(shape)
+        receipts = np.array([case['receipts'] for case in chunk], dtype=np.float64).reshape(shape)
+        expected = np.array([case['expected'] for case in chunk], dtype=np.float64).reshape(shape)
+        
+        chunk_results = [None] * len(chunk)
+        pending = np.arange(len(chunk))
+        
+        # Walk the grid a tile of days coefficients at a time. Tiles are
+        # visited in loop order, so a case is finished at its first hit and
+        # drops out of the later tiles.
+        for a_start in range(0, len(EXPANDED_DAYS_COEFFS), LINEAR_SEARCH_A_TILE):
+            a_tile = EXPANDED_A[a_start:a_start + LINEAR_SEARCH_A_TILE]
+            tile_expected = expected[pending]
+            
+            # Evaluate every (a, b, c) in the tile at once; the terms are summed
+            # in the same order as the scalar formula so the tolerance checks
+            # see identical values
+            predicted = a_tile * days[pending] + EXPANDED_B * miles[pending] + EXPANDED_C * receipts[pending]
+            
+            # Linear formula without constant
+            plain_hit = np.abs(predicted - tile_expected) < 0.01
+            
+            # Linear formula with constant: the constants lie on an evenly spaced
+            # lattice much coarser than the tolerance, so only the lattice point
+            # nearest the residual can match. Round to it directly.
+            residual = tile_expected - predicted
+            nearest = np.rint((residual - EXPANDED_CONSTANTS[0]) / EXPANDED_CONSTANT_STEP)
+            nearest = nearest.clip(0, len(EXPANDED_CONSTANTS) - 1).astype(np.intp)
+            constant_hit = np.abs(predicted + EXPANDED_K[nearest] - tile_expected) < 0.01
+            
+            # Test with and without constants, taking the first (a, b, c) in loop order
+            hits = (plain_hit | constant_hit).reshape(len(pending), -1)
+            first_hits = np.argmax(hits, axis=1)
+            found = hits[np.arange(len(pending)), first_hits]
+            
+            for j in np.flatnonzero(found):
+                ai, bi, ci = np.unravel_index(first_hits[j], predicted.shape[1:])
+                constant_k = -1 if plain_hit[j, ai, bi, ci] else nearest[j, ai, bi, ci]
+                i = pending[j]
+                chunk_results[i] = linear_expanded_result(chunk[i], a_start + ai, bi, ci, constant_k)
+            
+            pending = pending[~found]
+            if not len(pending):
+                break
+        
+        results.extend(chunk_results)
+    
+    return results
+
+def test_linear_formula_expanded(case):
+    """Phase 1: Expanded linear formula search"""
+    return test_linear_formula_expanded_batch([case])[0]
+
+# Coefficient ranges for non-linear terms
+POLYNOMIAL_COEFFS = [x/10 for x in range(1, 201, 5)]  # 0.1 to 20.0
+
+POLYNOMIAL_A = np.array(POLYNOMIAL_COEFFS, dtype=np.float64)[:, None, None]
+POLYNOMIAL_B = np.array(POLYNOMIAL_COEFFS, dtype=np.float64)[None, :, None]
+POLYNOMIAL_C = np.array(POLYNOMIAL_COEFFS, dtype=np.float64)[None, None, :]
+
+def test_polynomial_formulas(case):
+    """Phase 2: Polynomial and non-linear formula search"""
+    days, miles, receipts, expected = case['days'], case['miles'], case['receipts'], case['expected']
+    case_num = case['case_num']
+    
+    # Every pattern is a*x + b*y + c*z for transformed inputs, so the
+    # transforms are taken once and each pattern costs three scaled grid
+    # axes and two adds. Patterns go in order of how often they have produced
+    # formulas, and the search stops at the first one that matches.
+    patterns = [
+        # Logarithmic and square root patterns
+        ('log_receipts', days, miles, math.log1p(receipts)),
+        ('sqrt_receipts', days, miles, math.sqrt(receipts)),
+        ('sqrt_miles', days, math.sqrt(miles), receipts),
+        ('log_miles', days, math.log1p(miles), receipts),
+        
+        # Quadratic patterns
+        ('quad_days', days * days, miles, receipts),
+        ('quad_miles', days, miles * miles, receipts),
+        ('quad_receipts', days, miles, receipts * receipts),
+        
+        # Power patterns
+        ('power_miles', days, miles ** 0.5, receipts),
+        ('power_receipts', days, miles, receipts ** 0.5),
+    ]
+    
+    for pattern_name, x, y, z in patterns:
+        predicted = POLYNOMIAL_A * x + POLYNOMIAL_B * y + POLYNOMIAL_C * z
+        hits = np.abs(predicted - expected) < 0.01
+        if not hits.any():
+            continue
+        
+        ai, bi, ci = np.unravel_index(np.argmax(hits), hits.shape)
+        a, b, c = POLYNOMIAL_COEFFS[ai], POLYNOMIAL_COEFFS[bi], POLYNOMIAL_COEFFS[ci]
+        return {
+            'case_num': case_num,
+            'formula_type': pattern_name,
+            'coeffs': [a, b, c],
+            'formula': f"{pattern_name}({a}, {b}, {c}) = {expected:.2f}",
+            'error': abs(float(predicted[ai, bi, ci]) - expected)
+        }
+    
+    return None
+
+INTERACTION_COEFFS = [x/10 for x in range(1, 101, 5)]  # 0.1 to 10.0
+
+INTERACTION_A = np.array(INTERACTION_COEFFS, dtype=np.float64)[:, None, None]
+INTERACTION_B = np.array(INTERACTION_COEFFS, dtype=np.float64)[None, :, None]
+INTERACTION_C = np.array(INTERACTION_COEFFS, dtype=np.float64)[None, None, :]
+INTERACTION_D = np.array(INTERACTION_COEFFS, dtype=np.float64)
+
+def test_interaction_formulas(case):
+    """Phase 2: Interaction term formulas"""
+    days, miles, receipts, expected = case['days'], case['miles'], case['receipts'], case['expected']
+    case_num = case['case_num']
+    
+    patterns = [
+        # Two-way interactions
+        ('days_miles_int', days * miles),
+        ('days_receipts_int', days * receipts),
+        ('miles_receipts_int', miles * receipts),
+        
+        # Three-way interaction
+        ('three_way_int', (days * miles * receipts) ** 0.33),
+        
+        # Ratio interactions
+        ('ratio_int', miles / max(days, 1)),
+    ]
+    
+    # Every pattern is a*days + b*miles + c*receipts + d*X, so for a given
+    # (a, b, c) the interaction coefficient is pinned to residual / X. Only
+    # grid values near that can match, which turns the d loop into a
+    # lookup on the (a, b, c) grid.
+    base = INTERACTION_A * days + INTERACTION_B * miles + INTERACTION_C * receipts
+    residual = expected - base
+    n_d = len(INTERACTION_COEFFS)
+    step = INTERACTION_D[1] - INTERACTION_D[0]
+    
+    # For each (a, b, c) keep the earliest (d, pattern) hit, ranked the way
+    # the nested loops visited them: d first, then pattern order
+    no_hit = n_d * len(patterns)
+    first_hit = np.full(base.shape, no_hit)
+    for p, (_, interaction) in enumerate(patterns):
+        if interaction == 0:
+            nearest = np.zeros(base.shape, dtype=np.intp)
+        else:
+            nearest = np.rint((residual / interaction - INTERACTION_D[0]) / step).astype(np.intp)
+        
+        # Grid values of d are step * X apart in predicted value, so every d
+        # within 0.01 / (step * X) grid steps of the nearest one can match.
+        # When that spacing is well above the tolerance only the nearest d
+        # is checked; when the reach spans the grid, every d is. Matches
+        # prefer the smallest d, and each check uses the scalar formula's
+        # operation order. With X == 0 every d predicts the same value, so
+        # the smallest one stands for all of them.
+        spacing = abs(step * interaction)
+        reach = 0 if interaction == 0 or spacing > 0.05 else math.ceil(0.01 / spacing)
+        if 2 * reach + 1 >= n_d:
+            d_indices = (np.full(base.shape, d) for d in range(n_d))
+        else:
+            d_indices = ((nearest + offset).clip(0, n_d - 1) for offset in range(-reach, reach + 1))
+        
+        for d_index in d_indices:
+            predicted = base + INTERACTION_D[d_index] * interaction
+            rank = d_index * len(patterns) + p
+            hit = (np.abs(predicted - expected) < 0.01) & (rank < first_hit)
+            first_hit[hit] = rank[hit]
+    
+    hits = first_hit < no_hit
+    if not hits.any():
+        return None
+    
+    ai, bi, ci = np.unravel_index(np.argmax(hits), hits.shape)
+    d_index, p = divmod(int(first_hit[ai, bi, ci]), len(patterns))
+    pattern_name, interaction = patterns[p]
+    a, b, c, d = (INTERACTION_COEFFS[ai], INTERACTION_COEFFS[bi],
+                  INTERACTION_COEFFS[ci], INTERACTION_COEFFS[d_index])
+    predicted = a * days + b * miles + c * receipts + d * interaction
+    return {
+        'case_num': case_num,
+        'formula_type': pattern_name,
+        'coeffs': [a, b, c, d],
+        'formula': f"{pattern_name}({a}, {b}, {c}, {d}) = {expected:.2f}",
+        'error': abs(predicted - expected)
+    }
+
+SEGMENTED_COEFFS = [x/10 for x in range(1, 151, 5)]  # 0.1 to 15.0
+
+SEGMENTED_A = np.array(SEGMENTED_COEFFS, dtype=np.float64)[:, None, None]
+SEGMENTED_B = np.array(SEGMENTED_COEFFS, dtype=np.float64)[None, :, None]
+SEGMENTED_C = np.array(SEGMENTED_COEFFS, dtype=np.float64)[None, None, :]
+
+def test_segmented_formulas(case):
+    """Phase 3: Segmented analysis by case characteristics"""
+    days, miles, receipts, expected = case['days'], case['miles'], case['receipts'], case['expected']
+    case_num = case['case_num']
+    mpd = case['mpd']
+    
+    # The segment depends only on the case, so pick each formula once and
+    # evaluate it over the whole (a, b, c) grid
+    a, b, c = SEGMENTED_A, SEGMENTED_B, SEGMENTED_C
+    
+    # Segment by trip duration
+    if days == 1:
+        # Single day special formulas
+        duration_predicted = a * 100 + b * miles + c * receipts
+    elif days <= 3:
+        # Short trip formulas
+        duration_predicted = a * days * 80 + b * miles + c * receipts
+    elif days <= 7:
+        # Medium trip formulas
+        duration_predicted = a * days * 60 + b * miles + c * receipts
+    else:
+        # Long trip formulas
+        duration_predicted = a * days * 40 + b * miles + c * receipts
+    
+    # Segment by efficiency
+    if mpd < 100:
+        efficiency_predicted = a * days + b * miles * 1.2 + c * receipts  # Low efficiency penalty
+    elif mpd > 250:
+        efficiency_predicted = a * days + b * miles * 0.8 + c * receipts  # High efficiency bonus
+    else:
+        efficiency_predicted = a * days + b * miles + c * receipts
+    
+    # Duration is tried before efficiency for each (a, b, c)
+    segments = [
+        ('segmented_duration', f"{days}_days", duration_predicted),
+        ('segmented_efficiency', f"{int(mpd)}_mpd", efficiency_predicted),
+    ]
+    hits = np.stack([np.abs(predicted - expected) < 0.01 for _, _, predicted in segments], axis=-1)
+    if not hits.any():
+        return None
+    
+    ai, bi, ci, si = np.unravel_index(np.argmax(hits), hits.shape)
+    formula_type, segment, predicted = segments[si]
+    a, b, c = SEGMENTED_COEFFS[ai], SEGMENTED_COEFFS[bi], SEGMENTED_COEFFS[ci]
+    return {
+        'case_num': case_num,
+        'formula_type': formula_type,
+        'coeffs': [a, b, c],
+        'segment': segment,
+        'formula': f"{formula_type}({a}, {b}, {c}) = {expected:.2f}",
+        'error': abs(float(predicted[ai, bi, ci]) - expected)
+    }
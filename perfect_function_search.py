@@ -14,7 +14,6 @@ to select different coefficients, but follows a consistent pattern.
 
 import json
 import numpy as np
-import math
 from itertools import product
 
 def load_data():
@@ -176,6 +175,12 @@ def test_legacy_business_formulas(public_cases):
     
     print(f"\n=== TESTING LEGACY 1960s BUSINESS FORMULAS ===")
     
+    # Inputs as columns, so each candidate is evaluated once over all cases
+    days = np.array([case['input']['trip_duration_days'] for case in public_cases], dtype=np.float64)
+    miles = np.array([case['input']['miles_traveled'] for case in public_cases], dtype=np.float64)
+    receipts = np.array([case['input']['total_receipts_amount'] for case in public_cases], dtype=np.float64)
+    expected = np.array([case['expected_output'] for case in public_cases], dtype=np.float64)
+    
     legacy_candidates = [
         {
             'name': '1960s Government Rate',
@@ -191,22 +196,22 @@ def test_legacy_business_formulas(public_cases):
         
         {
             'name': 'Corporate Rate Structure',
-            'formula': lambda d, m, r: d * 10 + m * 0.08 + min(r * 0.85, 100 * d),  # Receipt cap
+            'formula': lambda d, m, r: d * 10 + m * 0.08 + np.minimum(r * 0.85, 100 * d),  # Receipt cap
             'desc': '$10/day + $0.08/mile + 85% receipts (capped at $100/day)'
         },
         
         {
             'name': 'Distance Tiered Rate',
-            'formula': lambda d, m, r: d * 11 + (m * 0.15 if m <= 300 else 300 * 0.15 + (m-300) * 0.08) + r * 0.70,
+            'formula': lambda d, m, r: d * 11 + np.where(m <= 300, m * 0.15, 300 * 0.15 + (m-300) * 0.08) + r * 0.70,
             'desc': '$11/day + tiered mileage (15¢ first 300mi, 8¢ after) + 70% receipts'
         },
         
         {
             'name': 'Complex Legacy Formula',
             'formula': lambda d, m, r: (
-                d * (8 + min(d, 7) * 0.5) +  # Progressive daily rate
-                m * (0.06 + 0.02 * min(math.floor(m/200), 3)) +  # Distance tiers
-                r * (0.9 - 0.05 * min(math.floor(r/500), 3))  # Spending tiers
+                d * (8 + np.minimum(d, 7) * 0.5) +  # Progressive daily rate
+                m * (0.06 + 0.02 * np.minimum(np.floor(m / 200), 3)) +  # Distance tiers
+                r * (0.9 - 0.05 * np.minimum(np.floor(r / 500), 3))  # Spending tiers
             ),
             'desc': 'Progressive daily + distance tiers + spending tiers'
         }
@@ -216,26 +221,8 @@ def test_legacy_business_formulas(public_cases):
         print(f"\nTesting: {candidate['name']}")
         print(f"Formula: {candidate['desc']}")
         
-        exact_matches = 0
-        errors = []
-        
-        for case in public_cases:
-            input_data = case['input']
-            days = input_data['trip_duration_days']
-            miles = input_data['miles_traveled']
-            receipts = input_data['total_receipts_amount']
-            expected = case['expected_output']
-            
-            try:
-                predicted = candidate['formula'](days, miles, receipts)
-                error = abs(predicted - expected)
-                errors.append(error)
-                
-                if error < 0.01:
-                    exact_matches += 1
-                    
-            except Exception as e:
-                errors.append(1000)
+        errors = np.abs(candidate['formula'](days, miles, receipts) - expected)
+        exact_matches = int(np.count_nonzero(errors < 0.01))
         
         avg_error = np.mean(errors)
         score = avg_error * 100 + (1000 - exact_matches) * 0.1
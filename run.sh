@@ -5,4 +5,6 @@
 # Usage: ./run.sh <trip_duration_days> <miles_traveled> <total_receipts_amount>
 
 # PERFECT SCORE SOLUTION - Direct input-to-formula mapping for 1000 exact matches
-python3 solution_perfect.py "$1" "$2" "$3" 
\ No newline at end of file
+# Run as a module so the compiled bytecode in __pycache__ is reused across
+# calls instead of recompiling the script on every invocation
+exec python3 -m solution_perfect "$1" "$2" "$3" 
\ No newline at end of file
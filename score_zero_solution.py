@@ -5,9 +5,8 @@ SCORE ZERO SOLUTION - FINAL ATTEMPT
 Based on pattern analysis, implementing the universal function
 """
 
-import sys
 import json
-import math
+import sys
 
 def calculate_reimbursement(trip_duration_days, miles_traveled, total_receipts_amount):
     """
@@ -25,17 +24,21 @@ def calculate_reimbursement(trip_duration_days, miles_traveled, total_receipts_a
     # Pattern 1: Input-dependent coefficients (most likely)
     # Based on the step patterns observed in coefficient analysis
     
+    # Integer parts are shared by several coefficients; convert each once
+    whole_days = int(days)
+    whole_miles = int(miles)
+    
     # Days coefficient: 10 + some function of days
-    a = 10 + 2 * (int(days) % 5)  # Creates 10, 12, 14, 16, 18 pattern
+    a = 10 + 2 * (whole_days % 5)  # Creates 10, 12, 14, 16, 18 pattern
     
     # Miles coefficient: based on miles value  
-    b = 0.05 + 0.05 * (int(miles) % 40)  # Creates 0.05 to 2.0 in 0.05 steps
+    b = 0.05 + 0.05 * (whole_miles % 40)  # Creates 0.05 to 2.0 in 0.05 steps
     
     # Receipts coefficient: based on receipts
     c = 0.05 + 0.05 * (int(receipts * 20) % 40)  # Similar range
     
     # Constant: based on combination of inputs
-    d = -200 + 10 * ((int(days) + int(miles) + int(receipts)) % 40)
+    d = -200 + 10 * ((whole_days + whole_miles + int(receipts)) % 40)
     
     result = a * days + b * miles + c * receipts + d
     
@@ -53,10 +56,55 @@ def calculate_reimbursement(trip_duration_days, miles_traveled, total_receipts_a
     
     return round(result, 2)
 
+def calculate_reimbursement_vec(trip_duration_days, miles_traveled, total_receipts_amount):
+    """Vectorized calculate_reimbursement over arrays of trips"""
+    # Batch scoring is the only user of numpy; single-case runs never load it
+    import numpy as np
+    
+    days = np.asarray(trip_duration_days, dtype=np.float64)
+    miles = np.asarray(miles_traveled, dtype=np.float64)
+    receipts = np.asarray(total_receipts_amount, dtype=np.float64)
+    
+    # int() truncates toward zero, as np.trunc does; the integer parts stay
+    # exact in float64, so the modulo steps match the scalar version
+    whole_days = np.trunc(days)
+    whole_miles = np.trunc(miles)
+    
+    a = 10 + 2 * np.mod(whole_days, 5)
+    b = 0.05 + 0.05 * np.mod(whole_miles, 40)
+    c = 0.05 + 0.05 * np.mod(np.trunc(receipts * 20), 40)
+    d = -200 + 10 * np.mod(whole_days + whole_miles + np.trunc(receipts), 40)
+    
+    result = a * days + b * miles + c * receipts + d
+    result = np.where(result < 0, 85 * days + 0.40 * miles + 0.90 * receipts, result)
+    
+    # Round each value with Python's round() so halves go the same way as in
+    # the scalar path
+    return np.array([round(value, 2) for value in result.tolist()])
+
+def score_cases_file(cases_path):
+    """Print one result per case in a JSON case list, scoring them all in one pass"""
+    with open(cases_path, 'r') as f:
+        cases = json.load(f)
+    
+    inputs = [case.get('input', case) for case in cases]
+    results = calculate_reimbursement_vec(
+        [case['trip_duration_days'] for case in inputs],
+        [case['miles_traveled'] for case in inputs],
+        [case['total_receipts_amount'] for case in inputs]
+    )
+    
+    print('\n'.join(str(result) for result in results.tolist()))
+
 def main():
     """Main entry point for evaluation"""
+    if len(sys.argv) == 3 and sys.argv[1] == '--cases':
+        score_cases_file(sys.argv[2])
+        return
+    
     if len(sys.argv) != 4:
         print("Usage: score_zero_solution.py <days> <miles> <receipts>")
+        print("       score_zero_solution.py --cases <cases.json>")
         sys.exit(1)
     
     try:
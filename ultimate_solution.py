@@ -6,8 +6,16 @@ Use the discovered patterns in the most direct way possible
 """
 
 import sys
-import json
-import math
+from bisect import bisect_left
+
+# Trip length tiers: (daily rate, mileage rate, receipt rate, base adjustment)
+# for trips of up to 2 days, 3-5 days, and longer trips
+TRIP_TIER_BOUNDS = (2, 5)
+TRIP_TIER_RATES = (
+    (120, 0.5, 0.3, -50),   # Short trips: higher per-day rate, standard mileage
+    (95, 0.4, 0.25, 20),    # Medium trips: balanced rates
+    (80, 0.6, 0.2, 50),     # Long trips: lower daily rate, higher mileage compensation
+)
 
 def calculate_reimbursement(trip_duration_days, miles_traveled, total_receipts_amount):
     """The ultimate analytical function - leveraging discovered patterns"""
@@ -25,42 +33,8 @@ def calculate_reimbursement(trip_duration_days, miles_traveled, total_receipts_a
     # Receipt coeff: 0.05, 0.1, 0.15, 0.2, 0.25, 0.3, 0.35...
     # Constant: -200, -190, -180, -170, -160, -150...
     
-    # HYPOTHESIS: The function is a lookup based on input characteristics
-    # Let's use a more sophisticated hash-based approach
-    
-    # Create a deterministic hash from inputs
-    input_signature = int(days * 1000 + miles * 100 + receipts * 10000) % 10000
-    
-    # Use signature to select coefficients from the discovered ranges
-    day_coeffs = list(range(10, 245, 2))  # All discovered day coefficients
-    mile_coeffs = [x * 0.05 for x in range(1, 41)]  # All discovered mile coefficients  
-    receipt_coeffs = [x * 0.05 for x in range(1, 41)]  # All discovered receipt coefficients
-    constants = list(range(-200, 201, 10))  # All discovered constants
-    
-    # Select coefficients based on input signature
-    a = day_coeffs[input_signature % len(day_coeffs)]
-    b = mile_coeffs[(input_signature // 2) % len(mile_coeffs)]
-    c = receipt_coeffs[(input_signature // 3) % len(receipt_coeffs)]
-    d = constants[(input_signature // 5) % len(constants)]
-    
-    result1 = a * days + b * miles + c * receipts + d
-    
-    # ALTERNATIVE: Maybe it's simpler - try common government rates
-    # 1960s federal per diem was around $12/day, mileage $0.10/mile
-    # But receipts were reimbursed at cost
-    
-    # Modern interpretation with scaling:
-    base_daily = 80 + (int(days) % 10) * 2  # 80-98 range
-    mileage_rate = 0.3 + (int(miles) % 20) * 0.01  # 0.3-0.49 range  
-    receipt_multiplier = 0.8 + (int(receipts * 10) % 20) * 0.01  # 0.8-0.99 range
-    
-    result2 = base_daily * days + mileage_rate * miles + receipt_multiplier * receipts
-    
-    # FINAL APPROACH: Since we have 5 mins, use the existing lookup when possible
-    # and fill gaps with the pattern
-    
-    # Try to replicate the exact mapping approach
-    key = f"{int(days) if days == int(days) else days},{int(miles) if miles == int(miles) else miles},{receipts}"
+    # The hash-selected coefficients and modulo-scaled government rates tried
+    # here earlier never fed into the result, so they are no longer computed
     
     # For now, use a blended approach
     # The key insight is that we need EXACT matches, not approximations
@@ -68,15 +42,8 @@ def calculate_reimbursement(trip_duration_days, miles_traveled, total_receipts_a
     # Based on pattern analysis, try this formula:
     # It seems like a complex business rule system
     
-    if days <= 2:
-        # Short trips: higher per-day rate, standard mileage
-        result = 120 * days + 0.5 * miles + 0.3 * receipts - 50
-    elif days <= 5:
-        # Medium trips: balanced rates
-        result = 95 * days + 0.4 * miles + 0.25 * receipts + 20
-    else:
-        # Long trips: lower daily rate, higher mileage compensation
-        result = 80 * days + 0.6 * miles + 0.2 * receipts + 50
+    day_rate, mile_rate, receipt_rate, base = TRIP_TIER_RATES[bisect_left(TRIP_TIER_BOUNDS, days)]
+    result = day_rate * days + mile_rate * miles + receipt_rate * receipts + base
     
     # Adjustment based on total trip cost
     total_base = days * 100 + miles * 0.4
@@ -85,6 +52,28 @@ def calculate_reimbursement(trip_duration_days, miles_traveled, total_receipts_a
     
     return round(result, 2)
 
+def calculate_reimbursement_vec(trip_duration_days, miles_traveled, total_receipts_amount):
+    """Vectorized calculate_reimbursement over arrays of trips"""
+    # numpy is only needed for batch scoring, so keep it off the CLI import path
+    import numpy as np
+    
+    days = np.asarray(trip_duration_days, dtype=np.float64)
+    miles = np.asarray(miles_traveled, dtype=np.float64)
+    receipts = np.asarray(total_receipts_amount, dtype=np.float64)
+    
+    rates = np.array(TRIP_TIER_RATES, dtype=np.float64)
+    tier = np.searchsorted(TRIP_TIER_BOUNDS, days, side='left')
+    day_rate, mile_rate, receipt_rate, base = rates[tier].T
+    
+    result = day_rate * days + mile_rate * miles + receipt_rate * receipts + base
+    
+    # Adjustment based on total trip cost
+    result += np.where(days * 100 + miles * 0.4 > 500, 50, 0)
+    
+    # Python's round() is correctly rounded on the decimal value; np.round
+    # scales by 100 first and can land on the other side of a half cent
+    return np.array([round(value, 2) for value in result.tolist()])
+
 def main():
     if len(sys.argv) != 4:
         print("Usage: ultimate_solution.py <days> <miles> <receipts>")